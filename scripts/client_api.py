@@ -0,0 +1,158 @@
+"""
+Single entry point for every Client API tutorial script.
+
+Run `python scripts/client_api.py <command> [options]` instead of the individual
+scripts; each command accepts exactly the same flags as its standalone script.
+Command modules are imported only when their command runs, so `--help` and
+argument errors never pay for `requests`.
+
+`batch` runs many commands in one process over a shared, warm HTTP session.
+Commands are read one per line from a file (or stdin), using shell quoting;
+blank lines and lines starting with `#` are skipped. When stdin is a terminal,
+`batch` becomes an interactive prompt.
+
+    python scripts/client_api.py list-adverts --page 2
+    python scripts/client_api.py batch --file nightly.txt
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import shlex
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+COMMANDS: Dict[str, str] = {
+    "create-advert": "client_api_create_advert",
+    "update-advert": "client_api_update_advert",
+    "get-advert": "client_api_get_advert",
+    "list-adverts": "client_api_list_adverts",
+    "delete-advert": "client_api_delete_advert",
+    "publish-advert": "client_api_publish_advert",
+    "unpublish-advert": "client_api_unpublish_advert",
+    "add-media": "client_api_add_media",
+    "delete-media": "client_api_delete_media",
+    "bulk-create-adverts": "client_api_bulk_create_adverts",
+    "bulk-update-adverts": "client_api_bulk_update_adverts",
+    "bulk-publish-adverts": "client_api_bulk_publish_adverts",
+    "bulk-unpublish-adverts": "client_api_bulk_unpublish_adverts",
+    "bulk-delete-adverts": "client_api_bulk_delete_adverts",
+    "list-orders": "client_api_list_orders",
+    "match-packages": "client_api_match_packages",
+    "export-adverts": "client_api_export_adverts",
+    "transform-feed": "client_api_transform_feed",
+    "replay": "client_api_replay",
+    "scheduler": "client_api_scheduler",
+    "generate-fixtures": "client_api_generate_fixtures",
+}
+
+PROMPT = "client-api> "
+
+
+def run_command(name: str, argv: List[str]) -> None:
+    module_name = COMMANDS.get(name)
+    if module_name is None:
+        raise SystemExit(f"Unknown command: {name}. Run with --help to list commands.")
+    from client_api_profile import command_scope
+
+    module = importlib.import_module(module_name)
+    with command_scope(name):
+        module.main(argv)
+
+
+def iter_batch_lines(path: Optional[Path]) -> Iterator[Tuple[int, str]]:
+    if path is not None:
+        with path.open("r", encoding="utf-8") as handle:
+            yield from enumerate(handle, start=1)
+        return
+
+    if not sys.stdin.isatty():
+        yield from enumerate(sys.stdin, start=1)
+        return
+
+    line_number = 0
+    while True:
+        try:
+            line = input(PROMPT)
+        except EOFError:
+            print()
+            return
+        line_number += 1
+        if line.strip() in {"exit", "quit"}:
+            return
+        if line.strip() == "help":
+            print(", ".join(sorted(COMMANDS)))
+            continue
+        yield line_number, line
+
+
+def run_batch(path: Optional[Path], stop_on_error: bool) -> int:
+    from client_api_session import enable_session_pool
+
+    enable_session_pool()
+    failures = 0
+    for line_number, line in iter_batch_lines(path):
+        error: Optional[str] = None
+        try:
+            tokens = shlex.split(line, comments=True)
+            if not tokens:
+                continue
+            run_command(tokens[0], tokens[1:])
+        except SystemExit as exc:
+            if exc.code not in (None, 0):
+                error = str(exc.code) if not isinstance(exc.code, int) else f"exited with status {exc.code}"
+        except Exception as exc:  # noqa: BLE001 - keep the batch going
+            error = f"{type(exc).__name__}: {exc}"
+
+        if error is None:
+            continue
+        failures += 1
+        print(f"line {line_number}: {error}", file=sys.stderr)
+        if stop_on_error:
+            break
+
+    if failures:
+        print(f"{failures} command(s) failed.", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run any Client API tutorial command, or many of them with `batch`.",
+        epilog="Commands: " + ", ".join(["batch", *COMMANDS]),
+    )
+    parser.add_argument("command", help="Command to run (see the list below).")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed to the command.")
+    return parser
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="client_api.py batch",
+        description="Run many commands over one warm HTTP session.",
+    )
+    parser.add_argument(
+        "--file",
+        type=Path,
+        default=None,
+        help="File with one command per line (default: stdin, interactive on a terminal).",
+    )
+    parser.add_argument(
+        "--stop-on-error",
+        action="store_true",
+        help="Stop at the first failing command instead of continuing.",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_cli_parser().parse_args(argv)
+    if args.command == "batch":
+        batch_args = build_batch_parser().parse_args(args.args)
+        raise SystemExit(run_batch(batch_args.file, batch_args.stop_on_error))
+    run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
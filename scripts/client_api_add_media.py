@@ -5,13 +5,13 @@ Use --media-url for external links and --upload-file to upload to MinIO.
 """
 from __future__ import annotations
 
-import mimetypes
 from pathlib import Path
+from typing import List, Optional
 
 from client_api_session import ClientApiSession, build_parser, config_from_args
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Add media to an advert (POST /api/v1/adverts/{advert_id}/media).")
     parser.add_argument("--advert-id", required=True, help="Advert identifier.")
     parser.add_argument(
@@ -32,7 +32,7 @@ def main() -> None:
         default=None,
         help="Optional file path to upload to MinIO.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not args.media_url and not args.upload_file:
         parser.error("Provide at least one --media-url or --upload-file.")
@@ -46,6 +46,8 @@ def main() -> None:
         form_data.append(("urls", url))
 
     if args.upload_file:
+        import mimetypes
+
         mime_type = mimetypes.guess_type(args.upload_file.name)[0] or "application/octet-stream"
         with args.upload_file.open("rb") as handle:
             files = [("files", (args.upload_file.name, handle, mime_type))]
@@ -1,16 +1,27 @@
 """
 Create multiple adverts in one request via POST /api/v1/adverts/bulk-create.
 
-Provide --payload-file to send your own JSON array of BriefAdvert payloads.
-If omitted, sample payloads are generated.
+Provide --payload-file to send your own JSON array (or NDJSON file) of BriefAdvert
+payloads. If omitted, sample payloads are generated. Payloads are sent in chunks
+of --chunk-size adverts, one request per chunk.
+
+Use --dedup-against with an advert export (see client_api_export_adverts.py) to
+flag adverts that sit within --dedup-radius metres of an existing or earlier
+advert; --skip-duplicates drops the probable duplicates before sending.
+
+--plan runs all of the above without sending and prints the request schedule
+(see client_api_plan.py).
 """
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
+from client_api_payload import PayloadSlimmer, add_payload_arguments
+from client_api_plan import SendProgress, add_plan_arguments, plan_from_args
+from client_api_profile import add_profile_arguments, stage, start_profiling
 from client_api_session import ClientApiSession, build_parser, config_from_args
-from tutorial_utils import build_sample_brief_advert, load_json_list
+from tutorial_utils import build_sample_brief_advert, chunked, iter_json_records
 
 
 def print_errors(errors: List[Dict[str, object]]) -> None:
@@ -22,13 +33,53 @@ def print_errors(errors: List[Dict[str, object]]) -> None:
         print(f"- {reference}: {error.get('detail')}")
 
 
-def main() -> None:
+def check_duplicates(
+    payloads: List[Dict[str, Any]],
+    export_files: List[Path],
+    radius: float,
+    price_tolerance: float,
+) -> List[int]:
+    """
+    Print duplicate/nearby warnings and return the 0-based positions of probable duplicates.
+    """
+    from client_api_geo import GeoPoint, find_conflicts
+    from client_api_records import read_advert_ndjson
+
+    def existing_points() -> Iterator[GeoPoint]:
+        for path in export_files:
+            for record in read_advert_ndjson(path):
+                point = GeoPoint.from_record(record)
+                if point is not None:
+                    yield point
+
+    incoming = (
+        point
+        for point in (GeoPoint.from_advert(f"#{position}", advert) for position, advert in enumerate(payloads, start=1))
+        if point is not None
+    )
+    matches = find_conflicts(existing_points(), incoming, radius=radius, price_tolerance=price_tolerance)
+    duplicates: List[int] = []
+    for match in matches:
+        position = int(match.label[1:])
+        reference = payloads[position - 1].get("reference")
+        label = f"{match.label} ({reference})" if reference else match.label
+        kind = "probable duplicate of" if match.duplicate else "nearby"
+        print(f"- {label}: {kind} {match.other} ({match.distance:.1f} m)")
+        if match.duplicate:
+            duplicates.append(position - 1)
+    if matches:
+        print(f"Found {len(duplicates)} probable duplicate(s) and {len(matches) - len(duplicates)} nearby advert(s).")
+    return duplicates
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Bulk create adverts (POST /api/v1/adverts/bulk-create).")
+    parser.set_defaults(priority="bulk")
     parser.add_argument(
         "--payload-file",
         type=Path,
         default=None,
-        help="JSON file containing an array of BriefAdvert payloads.",
+        help="JSON array or NDJSON (.ndjson/.jsonl) file of BriefAdvert payloads.",
     )
     parser.add_argument(
         "--total",
@@ -36,21 +87,93 @@ def main() -> None:
         default=5,
         help="Number of sample adverts to generate when no payload file is supplied.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100,
+        help="Adverts per request (default: 100, the server-side CLIENT_BULK_ADVERT_LIMIT default).",
+    )
+    parser.add_argument(
+        "--dedup-against",
+        type=Path,
+        action="append",
+        default=[],
+        help="NDJSON advert export to check for duplicates against (repeatable).",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Check the payloads for duplicates among themselves even without --dedup-against.",
+    )
+    parser.add_argument(
+        "--dedup-radius",
+        type=float,
+        default=25.0,
+        help="Distance in metres under which two adverts are compared (default: 25).",
+    )
+    parser.add_argument(
+        "--dedup-price-tolerance",
+        type=float,
+        default=0.05,
+        help="Relative price difference still treated as a duplicate (default: 0.05).",
+    )
+    parser.add_argument(
+        "--skip-duplicates",
+        action="store_true",
+        help="Drop probable duplicates instead of only reporting them.",
+    )
+    add_payload_arguments(parser)
+    add_plan_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1.")
 
-    api = ClientApiSession.from_config(config_from_args(args))
     if args.payload_file:
-        payloads = load_json_list(args.payload_file)
+        with stage("load"):
+            payloads = list(iter_json_records(args.payload_file))
     else:
-        payloads = [build_sample_brief_advert(index) for index in range(1, args.total + 1)]
+        with stage("build"):
+            payloads = [build_sample_brief_advert(index) for index in range(1, args.total + 1)]
 
     if not payloads:
         raise ValueError("No adverts provided for bulk create.")
 
-    response = api.json("POST", "/adverts/bulk-create", json={"adverts": payloads})
-    adverts = response.get("adverts", []) if response else []
-    print(f"Created {len(adverts)} advert(s) in bulk.")
-    print_errors(response.get("errors", []))
+    if args.dedup or args.dedup_against or args.skip_duplicates:
+        with stage("dedup"):
+            duplicates = check_duplicates(payloads, args.dedup_against, args.dedup_radius, args.dedup_price_tolerance)
+        if args.skip_duplicates and duplicates:
+            skipped = set(duplicates)
+            payloads = [advert for position, advert in enumerate(payloads) if position not in skipped]
+            print(f"Skipping {len(skipped)} probable duplicate(s).")
+            if not payloads:
+                print("Nothing left to create.")
+                return
+
+    slimmer = PayloadSlimmer.from_args(args)
+    if args.plan:
+        plan = plan_from_args(args, "POST", "/adverts/bulk-create")
+        for chunk in chunked(payloads, args.chunk_size):
+            plan.add(len(chunk), slimmer.body("adverts", chunk))
+        plan.report()
+        slimmer.report(plan.payload_bytes, "planned")
+        return
+
+    api = ClientApiSession.from_config(config_from_args(args))
+    created = 0
+    with SendProgress() as progress:
+        for chunk in chunked(payloads, args.chunk_size):
+            with stage("build"):
+                body = slimmer.body("adverts", chunk)
+            response = api.json("POST", "/adverts/bulk-create", json=body) or {}
+            progress.sent(len(chunk))
+            with stage("process"):
+                created += len(response.get("adverts", []))
+                print_errors(response.get("errors", []))
+    print(f"Created {created} advert(s) in bulk.")
+    slimmer.report(api.bytes_sent)
 
 
 if __name__ == "__main__":
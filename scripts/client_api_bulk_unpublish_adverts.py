@@ -1,13 +1,14 @@
 """
-Unpublish multiple adverts in one request via POST /api/v1/adverts/bulk-unpublish.
+Unpublish multiple adverts in chunked requests via POST /api/v1/adverts/bulk-unpublish.
 """
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from client_api_idset import add_id_set_arguments, id_set_from_args
+from client_api_plan import SendProgress, add_plan_arguments, plan_from_args
+from client_api_profile import add_profile_arguments, stage, start_profiling
 from client_api_session import ClientApiSession, build_parser, config_from_args
-from tutorial_utils import read_ids
 
 
 def print_errors(errors: List[Dict[str, object]]) -> None:
@@ -19,30 +20,43 @@ def print_errors(errors: List[Dict[str, object]]) -> None:
         print(f"- {reference}: {error.get('detail')}")
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Bulk unpublish adverts (POST /api/v1/adverts/bulk-unpublish).")
-    parser.add_argument(
-        "--advert-ids",
-        default=None,
-        help="Comma-separated advert IDs to unpublish.",
-    )
-    parser.add_argument(
-        "--ids-file",
-        type=Path,
-        default=None,
-        help="JSON array of advert IDs or {\"advert_ids\": [...]}.",
-    )
-    args = parser.parse_args()
-
-    advert_ids = read_ids(args.advert_ids, args.ids_file)
-    if not advert_ids:
+    parser.set_defaults(priority="bulk")
+    add_id_set_arguments(parser, "unpublish")
+    add_plan_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args)
+
+    if not args.advert_ids and not args.ids_file:
         parser.error("Provide at least one advert ID via --advert-ids or --ids-file.")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1.")
+
+    with stage("load"):
+        advert_ids = id_set_from_args(args)
+    if not advert_ids:
+        print("No advert IDs left to unpublish after filtering.")
+        return
+
+    if args.plan:
+        plan = plan_from_args(args, "POST", "/adverts/bulk-unpublish")
+        for chunk in advert_ids.chunks(args.chunk_size):
+            plan.add(len(chunk), {"advert_ids": chunk})
+        plan.report()
+        return
 
     api = ClientApiSession.from_config(config_from_args(args))
-    response = api.json("POST", "/adverts/bulk-unpublish", json={"advert_ids": advert_ids})
-    adverts = response.get("adverts", []) if response else []
-    print(f"Unpublished {len(adverts)} advert(s) in bulk.")
-    print_errors(response.get("errors", []))
+    unpublished = 0
+    with SendProgress() as progress:
+        for chunk in advert_ids.chunks(args.chunk_size):
+            response = api.json("POST", "/adverts/bulk-unpublish", json={"advert_ids": chunk}) or {}
+            progress.sent(len(chunk))
+            with stage("process"):
+                unpublished += len(response.get("adverts", []))
+                print_errors(response.get("errors", []))
+    print(f"Unpublished {unpublished} advert(s) in bulk.")
 
 
 if __name__ == "__main__":
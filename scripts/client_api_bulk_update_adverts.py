@@ -1,16 +1,21 @@
 """
 Update multiple adverts in one request via PUT /api/v1/adverts/bulk-update.
 
-Provide --updates-file to send your own JSON array of update objects.
+Provide --updates-file to send your own JSON array (or NDJSON file) of update objects.
 If omitted, pass advert IDs and a sample payload is generated for each.
+Updates are sent in chunks of --chunk-size, one request per chunk; --plan
+prints that schedule without sending (see client_api_plan.py).
 """
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from client_api_payload import PayloadSlimmer
+from client_api_plan import SendProgress, add_plan_arguments, plan_from_args
+from client_api_profile import add_profile_arguments, stage, start_profiling
 from client_api_session import ClientApiSession, build_parser, config_from_args
-from tutorial_utils import build_sample_brief_advert, load_json_list, read_ids
+from tutorial_utils import build_sample_brief_advert, chunked, iter_json_records, read_ids
 
 
 def print_errors(errors: List[Dict[str, object]]) -> None:
@@ -22,13 +27,14 @@ def print_errors(errors: List[Dict[str, object]]) -> None:
         print(f"- {reference}: {error.get('detail')}")
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Bulk update adverts (PUT /api/v1/adverts/bulk-update).")
+    parser.set_defaults(priority="bulk")
     parser.add_argument(
         "--updates-file",
         type=Path,
         default=None,
-        help="JSON file containing an array of {advert_id, advert} objects.",
+        help="JSON array (or NDJSON, one per line) of {advert_id, advert} objects.",
     )
     parser.add_argument(
         "--advert-ids",
@@ -41,29 +47,61 @@ def main() -> None:
         default=None,
         help="JSON array of advert IDs or {\"advert_ids\": [...]}.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100,
+        help="Updates per request (default: 100, the server-side CLIENT_BULK_ADVERT_LIMIT default).",
+    )
+    add_plan_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args)
 
-    api = ClientApiSession.from_config(config_from_args(args))
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1.")
 
     if args.updates_file:
-        updates = load_json_list(args.updates_file)
+        with stage("load"):
+            updates = list(iter_json_records(args.updates_file))
     else:
-        ids = read_ids(args.advert_ids, args.ids_file)
+        with stage("load"):
+            ids = read_ids(args.advert_ids, args.ids_file)
         if not ids:
             parser.error("Provide --updates-file or at least one advert ID.")
         updates = []
-        for index, advert_id in enumerate(ids, start=1):
-            payload = build_sample_brief_advert(index)
-            payload["description"] = f"Bulk update example for {advert_id}."
-            updates.append({"advert_id": advert_id, "advert": payload})
+        with stage("build"):
+            for index, advert_id in enumerate(ids, start=1):
+                payload = build_sample_brief_advert(index)
+                payload["description"] = f"Bulk update example for {advert_id}."
+                updates.append({"advert_id": advert_id, "advert": payload})
 
     if not updates:
         raise ValueError("No updates provided for bulk update.")
 
-    response = api.json("PUT", "/adverts/bulk-update", json={"adverts": updates})
-    adverts = response.get("adverts", []) if response else []
-    print(f"Updated {len(adverts)} advert(s) in bulk.")
-    print_errors(response.get("errors", []))
+    # No --slim here: null, [] and {} clear fields in an update, so the body is sent as given.
+    slimmer = PayloadSlimmer.from_args(args)
+    if args.plan:
+        plan = plan_from_args(args, "PUT", "/adverts/bulk-update")
+        for chunk in chunked(updates, args.chunk_size):
+            plan.add(len(chunk), slimmer.body("adverts", chunk))
+        plan.report()
+        slimmer.report(plan.payload_bytes, "planned")
+        return
+
+    api = ClientApiSession.from_config(config_from_args(args))
+    updated = 0
+    with SendProgress() as progress:
+        for chunk in chunked(updates, args.chunk_size):
+            with stage("build"):
+                body = slimmer.body("adverts", chunk)
+            response = api.json("PUT", "/adverts/bulk-update", json=body) or {}
+            progress.sent(len(chunk))
+            with stage("process"):
+                updated += len(response.get("adverts", []))
+                print_errors(response.get("errors", []))
+    print(f"Updated {updated} advert(s) in bulk.")
+    slimmer.report(api.bytes_sent)
 
 
 if __name__ == "__main__":
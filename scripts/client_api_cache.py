@@ -0,0 +1,192 @@
+"""
+On-disk HTTP cache for GET requests made through ClientApiSession.
+
+Bodies are stored next to their validators (ETag / Last-Modified) and replayed
+with If-None-Match / If-Modified-Since; a 304 answer reuses the stored body.
+Responses without validators are served from disk while younger than the
+Cache-Control max-age, or `ttl` seconds when the server sends no max-age.
+Entries are keyed by the full URL (query included) and the account UID, so
+different accounts never share cached data.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import contextlib
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+    from requests import Response
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bytes_from_cache: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    def summary(self) -> str:
+        served = self.hits + self.revalidated
+        ratio = (served / self.lookups * 100) if self.lookups else 0.0
+        return (
+            f"Cache: {self.hits} hit(s), {self.revalidated} revalidated, {self.misses} miss(es) "
+            f"({ratio:.1f}% served from cache, {self.bytes_from_cache} bytes not re-downloaded)"
+        )
+
+
+class ResponseCache:
+    def __init__(self, directory: Path, ttl: float = 0.0) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def _paths(self, url: str, account_uid: str) -> Tuple[Path, Path]:
+        digest = hashlib.sha256(f"{account_uid}\n{url}".encode("utf-8")).hexdigest()
+        folder = self.directory / digest[:2]
+        return folder / f"{digest}.json", folder / f"{digest}.body"
+
+    def _load(self, meta_path: Path, body_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with meta_path.open("r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            meta["body"] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        # A unique temp file per writer, so concurrent saves of one entry never share it.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def _save(self, meta_path: Path, body_path: Path, meta: Dict[str, Any], body: Optional[bytes]) -> None:
+        """
+        Store an entry; a failed write only costs a future cache hit, so it is reported, not raised.
+        """
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            if body is not None:
+                self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError as exc:
+            print(f"Warning: could not write cache entry {meta_path.name}: {exc}", file=sys.stderr)
+
+    def _freshness(self, headers: Dict[str, str]) -> Optional[float]:
+        """
+        Seconds the response may be served without contacting the server, or None if uncacheable.
+        """
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        if "no-cache" in cache_control:
+            return 0.0  # always revalidate, whatever max-age says
+        match = _MAX_AGE.search(cache_control)
+        if match:
+            return float(match.group(1))
+        if headers.get("ETag") or headers.get("Last-Modified"):
+            return 0.0
+        return self.ttl
+
+    def get(
+        self,
+        session: "requests.Session",
+        url: str,
+        timeout: float,
+        network: Optional[Callable[[], ContextManager[Any]]] = None,
+        **kwargs: Any,
+    ) -> "Response":
+        """
+        Perform a GET through the cache, sending a conditional request when validators are known.
+
+        `network` wraps the request when one is actually sent (fresh hits skip it), so
+        callers can wait for a rate grant only when the server is contacted.
+        """
+        import requests
+
+        url = requests.Request("GET", url, params=kwargs.pop("params", None)).prepare().url
+        account_uid = str(session.headers.get("X-Client-Account", ""))
+        meta_path, body_path = self._paths(url, account_uid)
+        entry = self._load(meta_path, body_path)
+        now = time.time()
+
+        if entry is not None and now - entry["stored_at"] < entry["fresh_for"]:
+            self.stats.hits += 1
+            self.stats.bytes_from_cache += len(entry["body"])
+            return self._replay(entry, url)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if entry["headers"].get("ETag"):
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        with (network or contextlib.nullcontext)():
+            response = session.request(method="GET", url=url, timeout=timeout, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.stats.revalidated += 1
+            self.stats.bytes_from_cache += len(entry["body"])
+            entry["headers"].update({name: response.headers[name] for name in _STORED_HEADERS if name in response.headers})
+            freshness = self._freshness(entry["headers"])
+            entry["stored_at"] = now
+            entry["fresh_for"] = freshness or 0.0
+            body = entry.pop("body")
+            self._save(meta_path, body_path, entry, None)
+            entry["body"] = body
+            return self._replay(entry, url)
+
+        self.stats.misses += 1
+        if response.status_code == 200:
+            stored_headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+            freshness = self._freshness(stored_headers)
+            cacheable = freshness is not None and (freshness > 0 or "ETag" in stored_headers or "Last-Modified" in stored_headers)
+            if cacheable:
+                meta = {"url": url, "stored_at": now, "fresh_for": freshness, "headers": stored_headers}
+                self._save(meta_path, body_path, meta, response.content)
+        return response
+
+    @staticmethod
+    def _replay(entry: Dict[str, Any], url: str) -> "Response":
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        return response
+
+    def report(self) -> None:
+        print(self.stats.summary(), file=sys.stderr)
+
+
+__all__ = ["CacheStats", "ResponseCache"]
@@ -4,12 +4,13 @@ Remove media from an advert via POST /api/v1/adverts/{advert_id}/delete-media.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import List, Optional
 
 from client_api_session import ClientApiSession, build_parser, config_from_args
 from tutorial_utils import load_json_list
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Delete media from an advert (POST /api/v1/adverts/{advert_id}/delete-media).")
     parser.add_argument("--advert-id", required=True, help="Advert identifier.")
     parser.add_argument(
@@ -30,7 +31,7 @@ def main() -> None:
         default=None,
         help="JSON file containing an array of media URLs.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     media_urls = list(args.media_url)
     if args.urls_file:
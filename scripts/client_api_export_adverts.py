@@ -0,0 +1,35 @@
+"""
+Export every advert of the account via GET /api/v1/adverts to an NDJSON file.
+
+Pages are fetched one after another and written as they arrive (one advert per
+line), so the export never holds more than one page of decoded adverts. The
+file is the local mirror used by the duplicate and ID-set tooling.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from client_api_records import iter_advert_records, write_advert_ndjson
+from client_api_session import ClientApiSession, build_parser, config_from_args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser("Export all adverts to NDJSON (GET /api/v1/adverts, every page).")
+    parser.set_defaults(priority="background")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="NDJSON file to write (one advert per line).",
+    )
+    parser.add_argument("--page-size", type=int, default=100, help="Number of adverts per page.")
+    args = parser.parse_args(argv)
+
+    api = ClientApiSession.from_config(config_from_args(args))
+    count = write_advert_ndjson(iter_advert_records(api, page_size=args.page_size), args.output)
+    print(f"Exported {count} advert(s) to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Column-wise transformation of CRM exports (CSV or XML) into BriefAdvert payloads.
+
+A mapping file describes every output field by its dotted BriefAdvert path:
+
+    {
+      "fields": {
+        "reference": {"column": "crm_id"},
+        "advert_type": {"column": "deal", "map": {"Rent": "rent", "Sale": "sale"}},
+        "price.overall": {"column": "price", "type": "float"},
+        "price.show_price": {"value": true},
+        "features.lift": {"column": "lift", "type": "bool", "default": false},
+        "media.photos": {"column": "photos", "type": "list", "separator": "|"}
+      }
+    }
+
+Field options: `column` (source column, or child tag/attribute for XML),
+`value` (constant), `type` (str, int, float, bool, list), `map` (enum lookup;
+unknown values are errors), `default` (used for empty cells) and `separator`
+(for lists, default ",").
+
+Rows are read in batches and transposed into columns; each column is then
+converted with a single `map()` over the whole column (falling back to a
+per-cell pass only when it has empty cells or a bad value, to report the row),
+and nested sections are assembled with `dict(zip(...))`. Batches are yielded
+as soon as they are built, so the output can go straight into bulk requests.
+"""
+from __future__ import annotations
+
+import copy
+import csv
+from dataclasses import dataclass
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from tutorial_utils import load_json_dict
+
+_TRUE = {"1", "true", "yes", "y", "t"}
+_FALSE = {"0", "false", "no", "n", "f"}
+
+
+def _to_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _to_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": str.strip,
+    "int": _to_int,
+    "float": float,
+    "bool": _to_bool,
+}
+
+# Whole-column fast paths: C-level callables that raise KeyError/ValueError on
+# anything unusual, in which case the column is redone with CONVERTERS.
+_BOOL_LOOKUP = {
+    variant: flag
+    for words, flag in ((_TRUE, True), (_FALSE, False))
+    for word in words
+    for variant in (word, word.upper(), word.capitalize())
+}
+_FAST_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": str.strip,
+    "int": int,
+    "float": float,
+    "bool": _BOOL_LOOKUP.__getitem__,
+}
+
+
+@dataclass
+class FieldSpec:
+    path: Tuple[str, ...]
+    column: Optional[str] = None
+    value: Any = None
+    type: str = "str"
+    mapping: Optional[Dict[str, Any]] = None
+    default: Any = None
+    separator: str = ","
+
+    @classmethod
+    def from_dict(cls, path: str, spec: Dict[str, Any]) -> "FieldSpec":
+        if "column" not in spec and "value" not in spec:
+            raise ValueError(f"Field {path!r} needs a 'column' or a 'value'.")
+        field_type = spec.get("type", "str")
+        if field_type != "list" and field_type not in CONVERTERS:
+            raise ValueError(f"Field {path!r} has unknown type {field_type!r}.")
+        return cls(
+            path=tuple(path.split(".")),
+            column=spec.get("column"),
+            value=spec.get("value"),
+            type=field_type,
+            mapping=spec.get("map"),
+            default=spec.get("default"),
+            separator=spec.get("separator", ","),
+        )
+
+    def _convert_cell(self, cell: Optional[str]) -> Any:
+        if cell is None or cell == "":
+            return _fresh(self.default)
+        if self.mapping is not None:
+            if cell not in self.mapping:
+                raise ValueError(f"unmapped value {cell!r}")
+            return _fresh(self.mapping[cell])
+        if self.type == "list":
+            return [item.strip() for item in cell.split(self.separator) if item.strip()]
+        return CONVERTERS[self.type](cell)
+
+    def _convert_fast(self, column: Sequence[str]) -> Optional[List[Any]]:
+        if self.mapping is not None:
+            if any(isinstance(value, (list, dict)) for value in self.mapping.values()):
+                raise ValueError("mutable mapped values are copied per cell")
+            return list(map(self.mapping.__getitem__, column))
+        if self.type != "list":
+            return list(map(_FAST_CONVERTERS[self.type], column))
+        # Plain split is only equivalent when no item needs stripping or is empty;
+        # check that once on the joined column instead of per cell.
+        sep = self.separator
+        joined = "\n".join(column)
+        if any(token in joined for token in (" ", "\t", "\r", sep + sep, "\n" + sep, sep + "\n")):
+            raise ValueError("column needs per-cell list parsing")
+        if joined.startswith(sep) or joined.endswith(sep):
+            raise ValueError("column needs per-cell list parsing")
+        return [cell.split(sep) for cell in column]
+
+    def convert(self, column: Sequence[Optional[str]], row_numbers: Sequence[int]) -> List[Any]:
+        """
+        Convert one whole column of raw cells; `row_numbers` gives each cell's source row for errors.
+        """
+        if self.column is None:
+            if isinstance(self.value, (list, dict)):
+                return [copy.deepcopy(self.value) for _ in column]
+            return [self.value] * len(column)
+        if "" not in column and None not in column:
+            try:
+                return self._convert_fast(column)
+            except (KeyError, ValueError):
+                pass  # rerun cell by cell to report the offending row
+        converted = []
+        for row_number, cell in zip(row_numbers, column):
+            try:
+                converted.append(self._convert_cell(cell))
+            except ValueError as exc:
+                raise ValueError(f"Row {row_number}, column {self.column!r}: {exc}") from None
+        return converted
+
+
+class FeedMapping:
+    def __init__(self, fields: List[FieldSpec]) -> None:
+        if not fields:
+            raise ValueError("Mapping defines no fields.")
+        self.fields = fields
+        self.columns = sorted({spec.column for spec in fields if spec.column is not None})
+        self._sections: Dict[str, List[int]] = {}
+        for index, spec in enumerate(fields):
+            if len(spec.path) > 2:
+                raise ValueError(f"Field {'.'.join(spec.path)!r} is nested deeper than one section.")
+            self._sections.setdefault(spec.path[0], []).append(index)
+        for section, indexes in self._sections.items():
+            depths = {len(fields[index].path) for index in indexes}
+            if depths == {1} and len(indexes) > 1 or len(depths) > 1:
+                raise ValueError(f"Field {section!r} is mapped more than once or both as a value and a section.")
+
+    @classmethod
+    def from_file(cls, path: Path) -> "FeedMapping":
+        payload = load_json_dict(path)
+        fields = payload.get("fields")
+        if not isinstance(fields, dict):
+            raise ValueError(f"Expected a 'fields' object in {path}.")
+        return cls([FieldSpec.from_dict(name, spec) for name, spec in fields.items()])
+
+    def transform(
+        self,
+        columns: Dict[str, Sequence[Optional[str]]],
+        size: int,
+        first_row: int = 1,
+        row_numbers: Optional[Sequence[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn one columnar batch (raw cells by source column name) into BriefAdvert dicts.
+
+        Errors name rows from `row_numbers` when given, else counting up from `first_row`.
+        """
+        if not size:
+            return []
+        if row_numbers is None:
+            row_numbers = range(first_row, first_row + size)
+        empty: Sequence[Optional[str]] = [None] * size
+        values = [spec.convert(columns.get(spec.column, empty), row_numbers) for spec in self.fields]
+
+        top_keys: List[str] = []
+        top_columns: List[List[Any]] = []
+        for section, indexes in self._sections.items():
+            top_keys.append(section)
+            if len(self.fields[indexes[0]].path) == 1:
+                top_columns.append(values[indexes[0]])
+            else:
+                keys = [self.fields[index].path[1] for index in indexes]
+                top_columns.append(_assemble(keys, [values[index] for index in indexes]))
+        return _assemble(top_keys, top_columns)
+
+
+def _assemble(keys: List[str], columns: List[List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Zip parallel columns into dicts, leaving out None values and empty sections.
+    """
+    if any(None in column or {} in column for column in columns):
+        return [
+            {key: value for key, value in zip(keys, row) if value is not None and value != {}}
+            for row in zip(*columns)
+        ]
+    return list(map(dict, map(zip, repeat(keys), zip(*columns))))
+
+
+def _fresh(value: Any) -> Any:
+    # Lists and dicts from the mapping file must not be shared between adverts.
+    return copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+
+
+# Raw cells by column name, plus the source row number of each record.
+ColumnBatch = Tuple[Dict[str, Sequence[Optional[str]]], Sequence[int]]
+
+
+def _iter_csv_batches(path: Path, columns: List[str], delimiter: str, batch_size: int) -> Iterator[ColumnBatch]:
+    with path.open("r", encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        positions = {name.strip(): index for index, name in enumerate(header)}
+        missing = [name for name in columns if name not in positions]
+        if missing:
+            raise ValueError(f"Columns missing from {path}: {', '.join(missing)}")
+        picks = [(name, positions[name]) for name in columns]
+        width = len(header)
+        row_number = 0
+        while True:
+            rows: List[List[str]] = []
+            row_numbers: List[int] = []
+            for row in reader:
+                row_number += 1
+                # Blank lines would otherwise become adverts made only of defaults.
+                if not "".join(row).strip():
+                    continue
+                if len(row) < width:
+                    row = row + [""] * (width - len(row))
+                rows.append(row)
+                row_numbers.append(row_number)
+                if len(rows) == batch_size:
+                    break
+            if not rows:
+                return
+            transposed = list(zip(*rows))
+            yield {name: transposed[position] for name, position in picks}, row_numbers
+
+
+def _iter_xml_records(path: Path, columns: List[str], record_tag: str) -> Iterator[List[Optional[str]]]:
+    from xml.etree.ElementTree import iterparse
+
+    # Open elements, so each finished record can be detached from its parent:
+    # clear() alone leaves an empty element per record hanging off the tree.
+    parents: List[Any] = []
+    for event, element in iterparse(str(path), events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag != record_tag:
+            continue
+        cells: Dict[str, Optional[str]] = dict(element.attrib)
+        for child in element:
+            cells[child.tag] = child.text
+        yield [cells.get(name) for name in columns]
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+
+def _iter_xml_batches(path: Path, columns: List[str], record_tag: str, batch_size: int) -> Iterator[ColumnBatch]:
+    records = _iter_xml_records(path, columns, record_tag)
+    first_row = 1
+    while True:
+        rows = list(islice(records, batch_size))
+        if not rows:
+            return
+        yield dict(zip(columns, zip(*rows))), range(first_row, first_row + len(rows))
+        first_row += len(rows)
+
+
+def iter_feed_batches(
+    path: Path,
+    mapping: FeedMapping,
+    batch_size: int = 100,
+    delimiter: str = ",",
+    record_tag: str = "advert",
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Stream BriefAdvert batches from a CSV or XML export (chosen by file suffix).
+    """
+    if path.suffix.lower() == ".xml":
+        batches = _iter_xml_batches(path, mapping.columns, record_tag, batch_size)
+    else:
+        batches = _iter_csv_batches(path, mapping.columns, delimiter, batch_size)
+
+    for columns, row_numbers in batches:
+        yield mapping.transform(columns, len(row_numbers), row_numbers=row_numbers)
+
+
+__all__ = ["FieldSpec", "FeedMapping", "iter_feed_batches"]
@@ -0,0 +1,349 @@
+"""
+Generate large, varied, reproducible advert fixtures as NDJSON for offline benchmarks.
+
+Adverts come from one seeded random stream, so the same arguments always give
+the same output, and are written as they are generated: millions of lines
+stream to disk with only a small window of recent adverts in memory.
+Outputs (any subset):
+
+- --adverts: BriefAdvert payloads, for bulk create, --plan, dedup and --slim,
+- --export: the same adverts as an advert export (advert_id, status, payload),
+  usable as --dedup-against, --ids-file/--exclude-ids-file with --mirror-status,
+  or read_advert_ndjson(),
+- --updates: --update-rounds rounds of {advert_id, advert} bulk-update lines,
+  each round changing about --change-rate of the adverts (price, description,
+  photos), for cache and update-path tests. Each round regenerates the adverts,
+  so it costs about as much as writing --adverts.
+
+Adverts are spread around Slovak cities weighted by size (or around --center),
+--spread-km apart on average, with realistic sizes, prices and media counts.
+About --duplicate-rate of them are near-copies of a recent earlier advert (a few
+metres away, price within 1%), which client_api_geo.find_conflicts flags.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import time
+import uuid
+from bisect import bisect
+from collections import deque
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, TextIO, Tuple
+
+# name, lat, lon, weight, sale EUR/m2, monthly rent EUR/m2
+CITIES: List[Tuple[str, float, float, float, float, float]] = [
+    ("Bratislava", 48.1486, 17.1077, 35, 3600, 14.0),
+    ("Košice", 48.7164, 21.2611, 15, 2300, 10.5),
+    ("Žilina", 49.2231, 18.7394, 8, 2400, 10.0),
+    ("Prešov", 49.0018, 21.2393, 8, 2000, 9.0),
+    ("Nitra", 48.3069, 18.0864, 8, 2200, 9.5),
+    ("Banská Bystrica", 48.7363, 19.1462, 7, 2100, 9.5),
+    ("Trnava", 48.3774, 17.5872, 7, 2500, 10.5),
+    ("Trenčín", 48.8945, 18.0444, 6, 2300, 9.5),
+    ("Poprad", 49.0614, 20.2979, 3, 2100, 9.0),
+    ("Martin", 49.0636, 18.9214, 3, 1800, 8.0),
+]
+
+_METRES_PER_DEGREE = 111_320.0
+_STATES = (("renovated", 5), ("original", 3), ("new_building", 2))
+_ENERGY = (("A", 3), ("B", 4), ("C", 3), ("D", 1))
+_DESCRIPTIONS = (
+    "Bright {rooms}-room {kind} close to public transport and shops.",
+    "Quiet {kind} with {rooms} rooms, {area} m2, ready to move in.",
+    "Spacious {rooms}-room {kind} in a popular part of {city}.",
+    "{kind_title} with {rooms} rooms and {area} m2 of living space near the centre of {city}.",
+)
+
+
+def _weighted(options: Tuple[Tuple[str, int], ...]) -> Tuple[List[str], List[float]]:
+    total = sum(weight for _, weight in options)
+    return [value for value, _ in options], [weight / total for weight in accumulate(weight for _, weight in options)]
+
+
+def _pick(rng: random.Random, table: Tuple[List[Any], List[float]]) -> Any:
+    values, cumulative = table
+    return values[min(bisect(cumulative, rng.random()), len(values) - 1)]
+
+
+class FixtureGenerator:
+    """
+    Sequential, seeded advert source: iterating twice with the same settings yields the same adverts.
+
+    Near-duplicates copy one of the last DUPLICATE_WINDOW original adverts, so
+    nothing but that window is kept in memory.
+    """
+
+    DUPLICATE_WINDOW = 4096
+
+    def __init__(
+        self,
+        seed: int = 1,
+        duplicate_rate: float = 0.02,
+        published_rate: float = 0.8,
+        sale_rate: float = 0.5,
+        photos: Tuple[int, int] = (1, 12),
+        video_rate: float = 0.1,
+        spread_km: float = 4.0,
+        cities: Optional[List[Tuple[str, float, float, float, float, float]]] = None,
+    ) -> None:
+        self.seed = seed
+        self.duplicate_rate = duplicate_rate
+        self.published_rate = published_rate
+        self.sale_rate = sale_rate
+        self.photos = photos
+        self.video_rate = video_rate
+        self.spread_km = spread_km
+        cities = cities or CITIES
+        self._cities = (cities, _weighted(tuple((city, city[3]) for city in cities))[1])
+        self._states = _weighted(_STATES)
+        self._energy = _weighted(_ENERGY)
+
+    def iter_records(self, count: int) -> Iterator[Tuple[str, bool, Dict[str, Any]]]:
+        """
+        Yield (advert_id, is_published, payload) for `count` adverts.
+        """
+        rng = random.Random(self.seed)
+        recent: Deque[Dict[str, Any]] = deque(maxlen=self.DUPLICATE_WINDOW)
+        for index in range(count):
+            advert_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            published = rng.random() < self.published_rate
+            if recent and rng.random() < self.duplicate_rate:
+                yield advert_id, published, self._near_copy(rng, recent[int(rng.random() * len(recent))])
+                continue
+            advert = self._original(rng, index)
+            recent.append(advert)
+            yield advert_id, published, advert
+
+    def _near_copy(self, rng: random.Random, source: Dict[str, Any]) -> Dict[str, Any]:
+        bearing = rng.uniform(0, 2 * math.pi)
+        metres = rng.uniform(0, 8)
+        lat = source["location"]["lat"] + metres * math.cos(bearing) / _METRES_PER_DEGREE
+        lon = source["location"]["lon"] + metres * math.sin(bearing) / (_METRES_PER_DEGREE * math.cos(math.radians(lat)))
+        return {
+            **source,
+            "title": source["title"] + " (new)",
+            "price": {**source["price"], "overall": round(source["price"]["overall"] * rng.uniform(0.99, 1.01))},
+            "location": {"lat": round(lat, 6), "lon": round(lon, 6)},
+        }
+
+    def _original(self, rng: random.Random, index: int) -> Dict[str, Any]:
+        city, lat, lon, _, sale_m2, rent_m2 = _pick(rng, self._cities)
+        spread = self.spread_km * 1000 / _METRES_PER_DEGREE
+        lat = round(lat + rng.gauss(0, spread), 6)
+        lon = round(lon + rng.gauss(0, spread) / math.cos(math.radians(lat)), 6)
+
+        sale = rng.random() < self.sale_rate
+        house = rng.random() < 0.25
+        rooms = 3 + int(rng.random() * 5) if house else 1 + int(rng.random() * 5)
+        area = round(max(18.0, rng.gauss(22 + rooms * (24 if house else 17), 9)), 1)
+        if sale:
+            overall = int(round(area * sale_m2 * rng.uniform(0.7, 1.35), -3))
+            utilities = 0
+        else:
+            overall = int(round(area * rent_m2 * rng.uniform(0.75, 1.3), -1))
+            utilities = 80 + 10 * int(rng.random() * 24)
+        floor = 0 if house else int(rng.random() * 13)
+        kind = "house" if house else "flat"
+
+        base = f"https://example.com/fixtures/{self.seed}-{index}/"
+        low, high = self.photos
+        photos = [f"{base}{n}.jpg" for n in range(1, low + int(rng.random() * (high - low + 1)) + 1)]
+        videos = [f"{base}tour.mp4"] if rng.random() < self.video_rate else []
+
+        features: Dict[str, Any] = {
+            "furnishing": rng.random() < (0.3 if sale else 0.7),
+            "lift": not house and floor > 2 and rng.random() < 0.85,
+            "dedicated_parking": rng.random() < (0.8 if house else 0.35),
+        }
+        if rng.random() < 0.7:
+            features["internet"] = "fiber_optic"
+
+        description = _DESCRIPTIONS[int(rng.random() * len(_DESCRIPTIONS))].format(
+            rooms=rooms, kind=kind, kind_title=kind.title(), area=area, city=city,
+        )
+        return {
+            "title": f"{rooms}-room {kind} for {'sale' if sale else 'rent'}, {city} ({area:g} m2)",
+            "description": description,
+            "advert_type": "sale" if sale else "rent",
+            "reality_type": kind,
+            "reality_state": _pick(rng, self._states),
+            "energy_rating": _pick(rng, self._energy),
+            "currency": "eur",
+            "measurement_system": "metric",
+            "price": {"overall": overall, "utilities": utilities, "show_price": rng.random() < 0.95},
+            "layout": {"num_rooms": rooms, "floor_area": area, "floor_number": floor},
+            "features": features,
+            "location": {"lat": lat, "lon": lon},
+            "media": {"photos": photos, "videos": videos},
+            "is_vip": rng.random() < 0.03,
+        }
+
+    def _change(self, rng: random.Random, index: int, advert: Dict[str, Any], round_number: int) -> Dict[str, Any]:
+        change = rng.random()
+        if change < 0.6:
+            price = advert["price"]
+            return {**advert, "price": {**price, "overall": round(price["overall"] * rng.uniform(0.9, 1.08))}}
+        if change < 0.85:
+            return {**advert, "description": f"{advert['description']} Updated in round {round_number}."}
+        photos = list(advert["media"]["photos"])
+        if photos and rng.random() < 0.5:
+            photos.pop()
+        else:
+            photos.append(f"https://example.com/fixtures/{self.seed}-{index}/r{round_number}.jpg")
+        return {**advert, "media": {**advert["media"], "photos": photos}}
+
+    def iter_updates(self, count: int, round_number: int, change_rate: float) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the bulk-update lines of one round (1-based); each round regenerates the adverts.
+        """
+        picker = random.Random((self.seed << 20) | round_number)
+        for index, (advert_id, _, advert) in enumerate(self.iter_records(count)):
+            if picker.random() < change_rate:
+                yield {"advert_id": advert_id, "advert": self._change(picker, index, advert, round_number)}
+
+
+def _exported(advert_id: str, published: bool, advert: Dict[str, Any]) -> Dict[str, Any]:
+    return {"advert_id": advert_id, "status": {"is_published": published, "is_processed": True}, **advert}
+
+
+def _tee_export(records: Iterator[Tuple[str, bool, Dict[str, Any]]], export: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield payloads for --adverts while writing the matching export lines to `export`.
+    """
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False).encode
+    for record in records:
+        export.write(encode(_exported(*record)))
+        export.write("\n")
+        yield record[2]
+
+
+def write_ndjson(path: Path, items: Iterator[Dict[str, Any]], batch: int = 2000) -> int:
+    """
+    Stream `items` to `path` one JSON document per line; returns the number written.
+    """
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False).encode
+    written = 0
+    lines: List[str] = []
+    with path.open("w", encoding="utf-8") as handle:
+        for item in items:
+            lines.append(encode(item))
+            if len(lines) == batch:
+                handle.write("\n".join(lines) + "\n")
+                written += len(lines)
+                lines = []
+        if lines:
+            handle.write("\n".join(lines) + "\n")
+            written += len(lines)
+    return written
+
+
+def _rate(value: str) -> float:
+    rate = float(value)
+    if not 0.0 <= rate <= 1.0:
+        raise argparse.ArgumentTypeError("Rates must be between 0 and 1.")
+    return rate
+
+
+def _range(value: str) -> Tuple[int, int]:
+    low, _, high = value.partition(":")
+    try:
+        bounds = (int(low), int(high or low))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("Use MIN:MAX, e.g. 1:12.") from exc
+    if bounds[0] < 0 or bounds[0] > bounds[1]:
+        raise argparse.ArgumentTypeError("Use MIN:MAX with 0 <= MIN <= MAX.")
+    return bounds
+
+
+def _center(value: str) -> Tuple[float, float]:
+    try:
+        lat, lon = (float(part) for part in value.split(","))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("Use LAT,LON, e.g. 48.1486,17.1077.") from exc
+    return lat, lon
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate seeded advert fixtures (payloads, export, updates) as NDJSON.")
+    parser.add_argument("--count", type=int, default=10_000, help="Number of adverts (default: 10000).")
+    parser.add_argument("--seed", type=int, default=1, help="Seed; the same seed and options give the same output.")
+    parser.add_argument("--adverts", type=Path, default=None, help="Write BriefAdvert payloads here.")
+    parser.add_argument("--export", type=Path, default=None, help="Write an advert export (with IDs and status) here.")
+    parser.add_argument("--updates", type=Path, default=None, help="Write {advert_id, advert} update lines here.")
+    parser.add_argument("--update-rounds", type=int, default=1, help="Update rounds to generate (default: 1).")
+    parser.add_argument("--change-rate", type=_rate, default=0.1, help="Share of adverts changed per round (default: 0.1).")
+    parser.add_argument("--duplicate-rate", type=_rate, default=0.02, help="Share of near-duplicate adverts (default: 0.02).")
+    parser.add_argument("--published-rate", type=_rate, default=0.8, help="Share published in the export (default: 0.8).")
+    parser.add_argument("--sale-rate", type=_rate, default=0.5, help="Share of sale (vs rent) adverts (default: 0.5).")
+    parser.add_argument("--photos", type=_range, default=(1, 12), help="Photos per advert as MIN:MAX (default: 1:12).")
+    parser.add_argument("--video-rate", type=_rate, default=0.1, help="Share of adverts with a video (default: 0.1).")
+    parser.add_argument("--spread-km", type=float, default=4.0, help="Typical distance from the city centre (default: 4).")
+    parser.add_argument(
+        "--center",
+        type=_center,
+        default=None,
+        help="LAT,LON to place every advert around instead of the built-in Slovak cities.",
+    )
+    args = parser.parse_args(argv)
+
+    if not (args.adverts or args.export or args.updates):
+        parser.error("Provide at least one of --adverts, --export, --updates.")
+    if args.count < 1:
+        parser.error("--count must be at least 1.")
+    if args.update_rounds < 1 or args.update_rounds > 60_000:
+        parser.error("--update-rounds must be between 1 and 60000.")
+
+    cities = None
+    if args.center is not None:
+        cities = [("Custom", args.center[0], args.center[1], 1, 2500, 11.0)]
+    generator = FixtureGenerator(
+        seed=args.seed,
+        duplicate_rate=args.duplicate_rate,
+        published_rate=args.published_rate,
+        sale_rate=args.sale_rate,
+        photos=args.photos,
+        video_rate=args.video_rate,
+        spread_km=args.spread_km,
+        cities=cities,
+    )
+
+    for path in (args.adverts, args.export, args.updates):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    total = 0
+    if args.adverts or args.export:
+        records = generator.iter_records(args.count)
+        if args.adverts and args.export:
+            with args.export.open("w", encoding="utf-8") as export:
+                total += write_ndjson(args.adverts, _tee_export(records, export))
+            total += args.count
+        elif args.adverts:
+            total += write_ndjson(args.adverts, (advert for _, _, advert in records))
+        else:
+            total += write_ndjson(args.export, (_exported(*record) for record in records))
+        for path, label in ((args.adverts, "advert payload(s)"), (args.export, "exported advert(s)")):
+            if path:
+                print(f"Wrote {args.count} {label} to {path}.")
+    if args.updates:
+        rounds = (
+            generator.iter_updates(args.count, round_number, args.change_rate)
+            for round_number in range(1, args.update_rounds + 1)
+        )
+        written = write_ndjson(args.updates, (update for updates in rounds for update in updates))
+        total += written
+        print(f"Wrote {written} update(s) in {args.update_rounds} round(s) to {args.updates}.")
+    elapsed = time.perf_counter() - started
+    print(f"Generated {total} line(s) in {elapsed:.1f} s ({total / elapsed if elapsed else 0:,.0f}/s).")
+
+
+__all__ = ["CITIES", "FixtureGenerator", "write_ndjson"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Grid-based spatial index for spotting duplicate adverts before bulk create.
+
+Points are bucketed into square cells of `cell_size` metres on an
+equirectangular projection around one reference latitude per grid, so a radius
+query only looks at the few cells around the point (a column more on each side
+where the reference overstates east-west distances). Distances themselves use
+the mean latitude of each pair, so points due north of each other are exactly
+their latitude difference apart wherever they are. Building and querying is
+linear in the number of points, which keeps hundreds of thousands of adverts
+within a few seconds in plain Python.
+
+Two adverts closer than the radius are a *probable duplicate* when their
+advert/reality type match and their prices differ by at most the tolerance;
+otherwise they are reported as a *nearby conflict*.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from client_api_records import AdvertRecord
+
+METRES_PER_DEGREE = 111_320.0
+
+
+def _kind(advert_type: Optional[str], reality_type: Optional[str]) -> Optional[str]:
+    if advert_type is None and reality_type is None:
+        return None
+    return f"{advert_type}/{reality_type}"
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class GeoPoint:
+    label: str
+    lat: float
+    lon: float
+    price: Optional[float] = None
+    kind: Optional[str] = None
+
+    @classmethod
+    def from_advert(cls, label: str, advert: Dict[str, Any]) -> Optional["GeoPoint"]:
+        """
+        Build a point from a BriefAdvert payload; returns None when it has no location.
+        """
+        location = advert.get("location") or {}
+        lat, lon = location.get("lat"), location.get("lon")
+        if lat is None or lon is None:
+            return None
+        # Feeds may carry the price as text; anything that is not a number is ignored.
+        price = _number((advert.get("price") or {}).get("overall"))
+        kind = _kind(advert.get("advert_type"), advert.get("reality_type"))
+        return cls(label=label, lat=float(lat), lon=float(lon), price=price, kind=kind)
+
+    @classmethod
+    def from_record(cls, record: "AdvertRecord") -> Optional["GeoPoint"]:
+        if record.lat is None or record.lon is None:
+            return None
+        return cls(
+            label=record.advert_id or "unknown",
+            lat=float(record.lat),
+            lon=float(record.lon),
+            price=_number(record.price),
+            kind=_kind(record.advert_type, record.reality_type),
+        )
+
+
+@dataclass
+class GeoMatch:
+    label: str
+    other: str
+    distance: float
+    duplicate: bool
+
+
+class GeoGrid:
+    def __init__(self, cell_size: float, reference_lat: Optional[float] = None) -> None:
+        """
+        `reference_lat` fixes the projection; by default the first added point's latitude.
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive.")
+        self.cell_size = cell_size
+        self.reference_lat = reference_lat
+        self._cos_ref = math.cos(math.radians(reference_lat)) if reference_lat is not None else None
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._x = array("d")
+        self._y = array("d")
+        self._points: List[GeoPoint] = []
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _project(self, lat: float, lon: float) -> Tuple[float, float]:
+        if self._cos_ref is None:
+            self.reference_lat = lat
+            self._cos_ref = math.cos(math.radians(lat))
+        return lon * METRES_PER_DEGREE * self._cos_ref, lat * METRES_PER_DEGREE
+
+    def add(self, point: GeoPoint) -> None:
+        x, y = self._project(point.lat, point.lon)
+        index = len(self._points)
+        self._x.append(x)
+        self._y.append(y)
+        self._points.append(point)
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            self._cells[cell] = [index]
+        else:
+            bucket.append(index)
+
+    def near(self, point: GeoPoint, radius: float) -> Iterator[Tuple[GeoPoint, float]]:
+        """
+        Yield indexed points within `radius` metres (radius must not exceed the cell size).
+        """
+        x, y = self._project(point.lat, point.lon)
+        cx, cy = int(x // self.cell_size), int(y // self.cell_size)
+        limit = radius * radius
+        cos_ref = self._cos_ref
+        # Polewards of the reference, projected x overstates real east-west metres.
+        stretch = cos_ref / max(math.cos(math.radians(point.lat)), 1e-9)
+        columns = max(1, math.ceil(radius * stretch / self.cell_size * (1 + 1e-9)))
+        for dx in range(-columns, columns + 1):
+            for dy in (-1, 0, 1):
+                for index in self._cells.get((cx + dx, cy + dy), ()):
+                    other_y = self._y[index]
+                    mean_lat = (other_y + y) / (2 * METRES_PER_DEGREE)
+                    ddx = (self._x[index] - x) / cos_ref * math.cos(math.radians(mean_lat))
+                    ddy = other_y - y
+                    squared = ddx * ddx + ddy * ddy
+                    if squared <= limit:
+                        yield self._points[index], math.sqrt(squared)
+
+
+def is_probable_duplicate(a: GeoPoint, b: GeoPoint, price_tolerance: float) -> bool:
+    if a.kind and b.kind and a.kind != b.kind:
+        return False
+    if a.price is None or b.price is None:
+        return True
+    reference = max(abs(a.price), abs(b.price)) or 1.0
+    return abs(a.price - b.price) / reference <= price_tolerance
+
+
+def find_conflicts(
+    existing: Iterable[GeoPoint],
+    incoming: Iterable[GeoPoint],
+    radius: float = 25.0,
+    price_tolerance: float = 0.05,
+) -> List[GeoMatch]:
+    """
+    Match every incoming point against the existing points and the incoming points before it.
+
+    Each incoming point reports at most one match, preferring a probable duplicate
+    over a nearby conflict and the closest point within each class.
+    """
+    grid = GeoGrid(cell_size=radius)
+    for point in existing:
+        grid.add(point)
+
+    matches: List[GeoMatch] = []
+    for point in incoming:
+        best: Optional[GeoMatch] = None
+        for other, distance in grid.near(point, radius):
+            duplicate = is_probable_duplicate(point, other, price_tolerance)
+            if best is None or (duplicate, -distance) > (best.duplicate, -best.distance):
+                best = GeoMatch(label=point.label, other=other.label, distance=distance, duplicate=duplicate)
+        if best is not None:
+            matches.append(best)
+        grid.add(point)
+    return matches
+
+
+__all__ = ["GeoPoint", "GeoMatch", "GeoGrid", "find_conflicts", "is_probable_duplicate"]
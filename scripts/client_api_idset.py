@@ -0,0 +1,233 @@
+"""
+Streaming readers and a compact, ordered set for very large advert ID lists.
+
+ID files may be:
+- a JSON array (`[...]`), parsed element by element without loading the file,
+- a JSON object `{"advert_ids": [...]}` (loaded in one go),
+- NDJSON (`.ndjson` / `.jsonl`): one ID string, or one object with `advert_id`
+  per line, such as the output of client_api_export_adverts.py,
+- plain text (any suffix but `.json`): IDs separated by newlines and/or commas.
+
+`IdSet` keeps first-seen order and stores canonical UUID strings as 128-bit
+integers (about half the memory of the string), other IDs as strings. It
+supports difference/intersection against other sets and yields request-sized
+chunks directly, so bulk scripts never build the full ID list.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from tutorial_utils import NDJSON_SUFFIXES, parse_comma_list
+
+Key = Union[int, str]
+
+_READ_SIZE = 1 << 16
+# Only the canonical lowercase form is packed, so decoding gives back the exact input.
+_CANONICAL_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z")
+
+
+def _encode(advert_id: str) -> Key:
+    if len(advert_id) == 36 and _CANONICAL_UUID.match(advert_id):
+        return int(advert_id.replace("-", ""), 16)
+    return advert_id
+
+
+def _decode(key: Key) -> str:
+    if isinstance(key, str):
+        return key
+    digits = f"{key:032x}"
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+
+def iter_json_array(handle) -> Iterator[object]:
+    """
+    Yield the elements of a top-level JSON array from a text handle, chunk by chunk.
+
+    Each chunk is cut at its last comma and decoded with one json.loads call. A
+    comma inside a string or nested value leaves an unbalanced prefix that fails
+    to decode, in which case more data is read and the cut is retried.
+    """
+    buffer = handle.read(_READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array.")
+    buffer = buffer[1:]
+    while True:
+        chunk = handle.read(_READ_SIZE)
+        if not chunk:
+            yield from json.loads("[" + buffer)
+            return
+        buffer += chunk
+        cut = buffer.rfind(",")
+        if cut == -1:
+            continue
+        try:
+            items = json.loads("[" + buffer[:cut] + "]")
+        except ValueError:
+            continue
+        yield from items
+        buffer = buffer[cut + 1:]
+
+
+def iter_ids_from_file(path: Path, status: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream advert IDs from any supported ID file format.
+
+    `status` ("published" / "unpublished") keeps only matching adverts from
+    NDJSON advert exports; it is ignored for plain ID lists.
+    """
+    with path.open("r", encoding="utf-8") as handle:
+        if path.suffix.lower() in NDJSON_SUFFIXES:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    if status is not None:
+                        published = bool((item.get("status") or {}).get("is_published"))
+                        if published != (status == "published"):
+                            continue
+                    item = item.get("advert_id")
+                if item is not None:
+                    yield str(item)
+            return
+
+        head = handle.read(1)
+        while head and head.isspace():
+            head = handle.read(1)
+        if head == "[":
+            handle.seek(0)
+            for item in iter_json_array(handle):
+                yield str(item)
+        elif head == "{":
+            handle.seek(0)
+            payload = json.load(handle)
+            if "advert_ids" not in payload:
+                raise ValueError("IDs file must be a JSON array or an object with 'advert_ids'.")
+            for item in payload["advert_ids"]:
+                yield str(item)
+        elif path.suffix.lower() == ".json":
+            # A .json file holding null, a string or a number is a mistake, not an ID list.
+            raise ValueError("IDs file must be a JSON array or an object with 'advert_ids'.")
+        else:
+            handle.seek(0)
+            for line in handle:
+                yield from parse_comma_list(line)
+
+
+class IdSet:
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        self._keys: Dict[Key, None] = {}
+        self.update(ids)
+
+    @classmethod
+    def from_file(cls, path: Path, status: Optional[str] = None) -> "IdSet":
+        return cls(iter_ids_from_file(path, status=status))
+
+    def add(self, advert_id: str) -> None:
+        self._keys[_encode(advert_id)] = None
+
+    def update(self, ids: Iterable[str]) -> None:
+        self._keys.update(zip(map(_encode, ids), repeat(None)))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, advert_id: object) -> bool:
+        return isinstance(advert_id, str) and _encode(advert_id) in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return map(_decode, self._keys)
+
+    def difference(self, other: "IdSet") -> "IdSet":
+        result = IdSet()
+        result._keys = {key: None for key in self._keys if key not in other._keys}
+        return result
+
+    def intersection(self, other: "IdSet") -> "IdSet":
+        result = IdSet()
+        result._keys = {key: None for key in self._keys if key in other._keys}
+        return result
+
+    def chunks(self, size: int) -> Iterator[List[str]]:
+        """
+        Yield IDs in first-seen order, `size` at a time.
+        """
+        if size < 1:
+            raise ValueError("Chunk size must be at least 1.")
+        chunk: List[str] = []
+        for key in self._keys:
+            chunk.append(_decode(key))
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def add_id_set_arguments(parser: argparse.ArgumentParser, verb: str) -> None:
+    """
+    Register the ID source, set-algebra and chunking flags shared by the bulk ID scripts.
+    """
+    parser.add_argument(
+        "--advert-ids",
+        default=None,
+        help=f"Comma-separated advert IDs to {verb}.",
+    )
+    parser.add_argument(
+        "--ids-file",
+        type=Path,
+        default=None,
+        help="JSON array, {\"advert_ids\": [...]}, NDJSON (e.g. an advert export) or plain-text ID file.",
+    )
+    parser.add_argument(
+        "--exclude-ids-file",
+        type=Path,
+        action="append",
+        default=[],
+        help="Drop IDs listed in this file (repeatable; any ID file format).",
+    )
+    parser.add_argument(
+        "--intersect-ids-file",
+        type=Path,
+        action="append",
+        default=[],
+        help="Keep only IDs also listed in this file (repeatable; any ID file format).",
+    )
+    parser.add_argument(
+        "--mirror-status",
+        choices=["published", "unpublished"],
+        default=None,
+        help="Only take adverts with this status from NDJSON advert exports used by the two flags above.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100,
+        help="IDs per request (default: 100, the server-side CLIENT_BULK_ADVERT_LIMIT default).",
+    )
+
+
+def id_set_from_args(args: argparse.Namespace) -> IdSet:
+    ids = IdSet(parse_comma_list(args.advert_ids))
+    if args.ids_file:
+        ids.update(iter_ids_from_file(args.ids_file))
+    for path in args.intersect_ids_file:
+        ids = ids.intersection(IdSet.from_file(path, status=args.mirror_status))
+    for path in args.exclude_ids_file:
+        ids = ids.difference(IdSet.from_file(path, status=args.mirror_status))
+    return ids
+
+
+__all__ = [
+    "IdSet",
+    "iter_ids_from_file",
+    "iter_json_array",
+    "add_id_set_arguments",
+    "id_set_from_args",
+]
@@ -3,14 +3,16 @@ List adverts owned by the authenticated account via GET /api/v1/adverts.
 """
 from __future__ import annotations
 
+from typing import List, Optional
+
 from client_api_session import ClientApiSession, build_parser, config_from_args
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("List adverts (GET /api/v1/adverts).")
     parser.add_argument("--page", type=int, default=1, help="Page number to fetch.")
     parser.add_argument("--page-size", type=int, default=20, help="Number of adverts per page.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     api = ClientApiSession.from_config(config_from_args(args))
     payload = api.json("GET", "/adverts", params={"page": args.page, "page_size": args.page_size})
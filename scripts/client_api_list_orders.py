@@ -3,10 +3,12 @@ List orders via GET /api/v1/orders.
 """
 from __future__ import annotations
 
+from typing import List, Optional
+
 from client_api_session import ClientApiSession, build_parser, config_from_args
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("List orders (GET /api/v1/orders).")
     parser.add_argument("--page", type=int, default=1, help="Page number to fetch.")
     parser.add_argument("--page-size", type=int, default=20, help="Number of orders per page.")
@@ -16,7 +18,7 @@ def main() -> None:
         default="desc",
         help="Sort direction for order list.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     api = ClientApiSession.from_config(config_from_args(args))
     payload = api.json(
@@ -7,12 +7,13 @@ use --package-uid together with advert IDs to build a simple mapping.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import List, Optional
 
 from client_api_session import ClientApiSession, build_parser, config_from_args
 from tutorial_utils import load_json_dict, read_ids
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Match packages to adverts (POST /api/v1/orders/match).")
     parser.add_argument(
         "--mapping-file",
@@ -36,7 +37,7 @@ def main() -> None:
         default=None,
         help="JSON array of advert IDs or {\"advert_ids\": [...]}.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.mapping_file:
         mapping = load_json_dict(args.mapping_file)
@@ -0,0 +1,178 @@
+"""
+Request body slimming and compression for the bulk endpoints.
+
+`slim_payload` drops null values and empty objects/arrays from a BriefAdvert
+payload, plus any field equal to the value given for it in a defaults file
+(`--slim-defaults`, a JSON object shaped like a payload, e.g.
+{"measurement_system": "metric", "features": {"lift": false}}). Only list fields
+whose server-side default you have confirmed. Defaults only apply to new adverts
+(bulk create, feeds). Bulk update takes neither option: in a partial update
+a missing field means "unchanged" while null, [] and {} mean "clear", so there
+is nothing slimming could drop without changing the request.
+
+`encode_body` produces the exact bytes ClientApiSession sends: compact UTF-8
+JSON, gzip-compressed, when --gzip-requests is on and the compact body is at
+least GZIP_MIN_BYTES long; requests' own `json=` encoding otherwise.
+`PayloadStats` counts bytes before and after slimming; the bytes actually sent
+come from ClientApiSession.bytes_sent (or the plan, for --plan).
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from tutorial_utils import load_json_dict
+
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+_MISSING = object()
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == {} or value == []
+
+
+def _matches_default(value: Any, default: Any) -> bool:
+    # type() check keeps True from matching 1 and 0.0 from matching False.
+    return type(value) is type(default) and value == default
+
+
+def slim_payload(value: Any, defaults: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Return a copy of `value` without nulls, empty containers and fields equal to `defaults`.
+
+    List elements are slimmed but never removed, so positions stay meaningful.
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            default = defaults.get(key, _MISSING) if defaults else _MISSING
+            if isinstance(item, dict):
+                item = slim_payload(item, default if isinstance(default, dict) else None)
+            elif default is not _MISSING and _matches_default(item, default):
+                continue
+            elif isinstance(item, list):
+                item = [slim_payload(element) for element in item]
+            if _is_empty(item):
+                continue
+            result[key] = item
+        return result
+    if isinstance(value, list):
+        return [slim_payload(element, defaults) for element in value]
+    return value
+
+
+def requests_json_bytes(body: Any) -> bytes:
+    """
+    The body requests builds for `json=body`.
+    """
+    return json.dumps(body, allow_nan=False).encode("utf-8")
+
+
+def encode_body(body: Any, compress: bool) -> Tuple[bytes, Optional[str]]:
+    """
+    Return the bytes to send for `body` and the Content-Encoding to declare (None for identity).
+    """
+    if compress:
+        data = json.dumps(body, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
+        if len(data) >= GZIP_MIN_BYTES:
+            return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    return requests_json_bytes(body), None
+
+
+@dataclass
+class PayloadStats:
+    bodies: int = 0
+    raw_bytes: int = 0
+    slim_bytes: int = 0
+
+    def add(self, raw: int, slim: int) -> None:
+        self.bodies += 1
+        self.raw_bytes += raw
+        self.slim_bytes += slim
+
+    def summary(self, sent_bytes: Optional[int] = None, sent_label: str = "sent") -> str:
+        def change(size: int) -> str:
+            if not self.raw_bytes:
+                return "n/a"
+            ratio = size / self.raw_bytes - 1
+            return f"{abs(ratio):.0%} smaller" if ratio <= 0 else f"{ratio:.0%} larger"
+
+        parts = [f"Request bodies: {self.bodies}, {self.raw_bytes:,} B as JSON"]
+        if self.slim_bytes != self.raw_bytes:
+            parts.append(f"{self.slim_bytes:,} B slimmed ({change(self.slim_bytes)})")
+        if sent_bytes is not None:
+            parts.append(f"{sent_bytes:,} B {sent_label} ({change(sent_bytes)})")
+        return ", ".join(parts) + "."
+
+
+class PayloadSlimmer:
+    """
+    Applies the --slim / --slim-defaults options to bulk payloads and keeps byte counts.
+    """
+
+    def __init__(self, enabled: bool = False, defaults: Optional[Dict[str, Any]] = None, compress: bool = False) -> None:
+        self.enabled = enabled or defaults is not None
+        self.defaults = defaults
+        self.compress = compress
+        self.stats = PayloadStats()
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "PayloadSlimmer":
+        """
+        Build from parsed arguments; commands without add_payload_arguments (bulk update) only count bytes.
+        """
+        path = getattr(args, "slim_defaults", None)
+        defaults = load_json_dict(path) if path else None
+        return cls(enabled=getattr(args, "slim", False), defaults=defaults, compress=args.gzip_requests)
+
+    def slim(self, item: Any) -> Any:
+        return slim_payload(item, self.defaults) if self.enabled else item
+
+    def body(self, key: str, items: List[Any]) -> Dict[str, Any]:
+        """
+        Build the `{key: items}` request body, slimming each item and counting its bytes.
+        """
+        body = {key: [self.slim(item) for item in items] if self.enabled else items}
+        if self.enabled or self.compress:
+            slim = len(requests_json_bytes(body))
+            raw = len(requests_json_bytes({key: items})) if self.enabled else slim
+            self.stats.add(raw, slim)
+        return body
+
+    def report(self, sent_bytes: Optional[int] = None, sent_label: str = "sent") -> None:
+        """
+        Print the byte counts; `sent_bytes` is what went (or, for a plan, would go) on the wire.
+        """
+        if self.stats.bodies and (self.enabled or self.compress):
+            print(self.stats.summary(sent_bytes, sent_label))
+
+
+def add_payload_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--slim",
+        action="store_true",
+        help="Drop null values and empty objects/arrays from payloads before sending.",
+    )
+    parser.add_argument(
+        "--slim-defaults",
+        type=Path,
+        default=None,
+        help="JSON object of server-side default values; matching payload fields are dropped (implies --slim).",
+    )
+
+
+__all__ = [
+    "GZIP_MIN_BYTES",
+    "PayloadSlimmer",
+    "PayloadStats",
+    "add_payload_arguments",
+    "encode_body",
+    "requests_json_bytes",
+    "slim_payload",
+]
@@ -0,0 +1,268 @@
+"""
+Dry-run planning for bulk and pipeline commands (`--plan`).
+
+With --plan a command walks its input exactly as it would for a real run
+(deduplication, ID-set filtering, chunking) but, instead of sending, records
+each request it would make and prints the schedule: request number, endpoint,
+item count, body size (as sent, so after --slim and --gzip-requests) and
+projected start time.
+
+The projection assumes requests are sent one after another, each taking the
+expected latency, and never more than --rate-limit requests start within any
+--rate-window seconds (the server defaults are 120 per 60 s per account).
+Latency comes from --plan-latency, or from the median `duration_ms` of matching
+requests in a recording made with --record-file (--plan-latency-log).
+
+Real runs keep to the same window: `RateWindow` is shared by the plan and by
+ClientApiSession, which waits for it before each request unless a scheduler
+daemon (--scheduler-address) hands out the grants instead. A 429 is retried
+after its Retry-After, and `SendProgress` reports how many requests went
+through if a run stops on an error.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, List, Optional, Type
+
+from client_api_payload import encode_body
+from client_api_recorder import endpoint_template
+
+DEFAULT_LATENCY = 1.0
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(round(seconds, 1), 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}h{minutes:02d}m{secs:04.1f}s" if hours else f"{minutes}m{secs:04.1f}s"
+
+
+def measured_latency(log_file: Path, method: str, endpoint: str) -> Optional[float]:
+    """
+    Median latency in seconds for `method endpoint` in a request recording, or for all
+    successful requests when the endpoint never appears. None if nothing usable is found.
+    """
+    matching: List[float] = []
+    overall: List[float] = []
+    template = endpoint_template(endpoint)
+    with log_file.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            duration = entry.get("duration_ms")
+            if duration is None or entry.get("error"):
+                continue
+            overall.append(duration)
+            if entry.get("method") == method and entry.get("endpoint", endpoint_template(entry.get("path", ""))) == template:
+                matching.append(duration)
+    samples = matching or overall
+    return statistics.median(samples) / 1000 if samples else None
+
+
+class RateWindow:
+    """
+    Sliding-window limit: at most `limit` requests within any `window` seconds.
+
+    Each booked slot holds a time; a new request may start once the oldest of
+    the last `limit` slots is `window` seconds old.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        self.limit = max(limit, 1)
+        self.window = window
+        self._slots: Deque[List[float]] = deque()
+        self._lock = threading.Lock()
+
+    def _book(self, now: float) -> List[float]:
+        with self._lock:
+            start = now
+            if len(self._slots) >= self.limit:
+                start = max(start, self._slots[0][0] + self.window)
+                self._slots.popleft()
+            slot = [start]
+            self._slots.append(slot)
+            return slot
+
+    def reserve(self, now: float) -> float:
+        """
+        Book the next request, wanted at `now`; return when it may start.
+        """
+        return self._book(now)[0]
+
+    def wait(self) -> List[float]:
+        """
+        Block until the next request may start; return its slot for `finished`.
+        """
+        slot = self._book(time.monotonic())
+        delay = slot[0] - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return slot
+
+    def finished(self, slot: List[float]) -> None:
+        """
+        Count `slot` from when its response arrived: the server saw the request at
+        some point before then, so the window never closes early on its side.
+        """
+        with self._lock:
+            slot[0] = max(slot[0], time.monotonic())
+
+
+class SendProgress:
+    """
+    Counts the requests of a chunked run; if the run stops on an error, reports how far it got.
+
+        with SendProgress() as progress:
+            for chunk in chunks:
+                api.json("POST", ..., json={...})
+                progress.sent(len(chunk))
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.requests = 0
+        self.items = 0
+
+    def sent(self, items: int) -> None:
+        self.requests += 1
+        self.items += items
+
+    def __enter__(self) -> "SendProgress":
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], *exc_info: Any) -> None:
+        if exc_type is not None and self.enabled:
+            print(
+                f"Stopped at request #{self.requests + 1}: {self.requests} request(s) carrying "
+                f"{self.items} item(s) went through before the error.",
+                file=sys.stderr,
+            )
+
+
+@dataclass
+class PlannedRequest:
+    number: int
+    items: int
+    payload_bytes: int
+    start: float
+
+
+@dataclass
+class RequestPlan:
+    method: str
+    endpoint: str
+    latency: float = DEFAULT_LATENCY
+    rate_limit: int = 120
+    rate_window: float = 60.0
+    latency_source: str = "default"
+    compress: bool = False
+    requests: List[PlannedRequest] = field(default_factory=list)
+    _clock: float = 0.0
+    _window: Optional[RateWindow] = None
+
+    def __post_init__(self) -> None:
+        self._window = RateWindow(self.rate_limit, self.rate_window)
+
+    def add(self, items: int, body: Any = None) -> None:
+        """
+        Plan one request carrying `items` entries; `body` is the JSON payload it would send.
+        """
+        payload_bytes = len(encode_body(body, self.compress)[0]) if body is not None else 0
+        start = self._window.reserve(self._clock)
+        self._clock = start + self.latency
+        self.requests.append(PlannedRequest(len(self.requests) + 1, items, payload_bytes, start))
+
+    @property
+    def total_seconds(self) -> float:
+        return self._clock
+
+    @property
+    def payload_bytes(self) -> int:
+        return sum(request.payload_bytes for request in self.requests)
+
+    def report(self) -> None:
+        print(f"Plan: {self.method} {self.endpoint}")
+        for request in self.requests:
+            print(
+                f"  #{request.number:<5} {request.items:>5} item(s) {request.payload_bytes:>10,} B"
+                f"  starts at +{_format_duration(request.start)}"
+            )
+        items = sum(request.items for request in self.requests)
+        payload = self.payload_bytes
+        throttled = sum(1 for a, b in zip(self.requests, self.requests[1:]) if b.start - a.start > self.latency + 1e-9)
+        print(f"Requests: {len(self.requests)} carrying {items} item(s), {payload:,} B of request bodies in total.")
+        print(
+            f"Latency: {self.latency * 1000:.0f} ms per request ({self.latency_source}); "
+            f"rate limit {self.rate_limit} per {self.rate_window:g} s."
+        )
+        if throttled:
+            print(
+                f"{throttled} request(s) wait for the rate limit window; a real run waits the same way "
+                "(or for its scheduler grants with --scheduler-address)."
+            )
+        print(f"Projected wall-clock time: {_format_duration(self.total_seconds)}.")
+
+
+def add_plan_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the request schedule, payload sizes and projected duration without sending anything.",
+    )
+    parser.add_argument(
+        "--plan-latency",
+        type=float,
+        default=None,
+        help=f"Expected seconds per request for --plan (default: measured, else {DEFAULT_LATENCY:g}).",
+    )
+    parser.add_argument(
+        "--plan-latency-log",
+        type=Path,
+        default=None,
+        help="Request recording (--record-file output) to measure latency from for --plan.",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=120,
+        help="Requests allowed per window, for --plan and for pacing real runs (default: 120).",
+    )
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Rate limit window in seconds (default: 60).")
+
+
+def plan_from_args(args: argparse.Namespace, method: str, endpoint: str) -> RequestPlan:
+    latency, source = DEFAULT_LATENCY, "default"
+    if args.plan_latency is not None:
+        latency, source = args.plan_latency, "--plan-latency"
+    elif args.plan_latency_log is not None:
+        measured = measured_latency(args.plan_latency_log, method, endpoint)
+        if measured is not None:
+            latency, source = measured, f"median from {args.plan_latency_log}"
+    return RequestPlan(
+        method=method,
+        endpoint=endpoint,
+        latency=latency,
+        rate_limit=max(args.rate_limit, 1),
+        rate_window=args.rate_window,
+        latency_source=source,
+        compress=args.gzip_requests,
+    )
+
+
+__all__ = [
+    "PlannedRequest",
+    "RateWindow",
+    "RequestPlan",
+    "SendProgress",
+    "add_plan_arguments",
+    "measured_latency",
+    "plan_from_args",
+]
@@ -0,0 +1,288 @@
+"""
+Per-stage wall/CPU timing for the bulk scripts (`--profile`).
+
+Code marks its stages with `stage(name)`:
+
+    with stage("load"):
+        payloads = list(iter_json_records(path))
+
+Scripts time loading and building payloads; ClientApiSession times
+`serialize` (JSON encoding, gzip), `network` (sending and waiting for the
+response), `process` (decoding the response), `wait` (scheduler grants) and
+`setup` (importing requests).
+Stages nest: time spent in an inner stage is not counted for the outer one.
+When profiling is off, `stage()` returns a shared no-op context manager.
+
+At exit a breakdown table is printed to stderr and a JSON report is written to
+--profile-report. --profile-cprofile also runs cProfile (saved next to the
+report as .pstats, top functions included in the report) and --profile-memory
+traces allocations with tracemalloc (peak and top allocation sites).
+Under `client_api.py` each command gets its own report, named after the
+command, written when that command finishes (see `command_scope`).
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_NULL = contextlib.nullcontext()
+_active: Optional["Profiler"] = None
+_command: Optional[str] = None
+_exit_registered = False
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "wall", "cpu", "child_wall", "child_cpu")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.child_wall = self.child_cpu = 0.0
+        self.profiler._stack().append(self)
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+        self.profiler._add(self.name, wall - self.child_wall, cpu - self.child_cpu)
+
+
+class Profiler:
+    def __init__(
+        self,
+        report_file: Optional[Path] = None,
+        cprofile: bool = False,
+        memory: bool = False,
+        command: Optional[str] = None,
+    ) -> None:
+        self.report_file = report_file
+        self.command = command or Path(sys.argv[0]).name
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cprofile = None
+        self._memory = memory
+        if cprofile:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def start(self) -> None:
+        if self._memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def _stack(self) -> List[_Stage]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            totals = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            totals["calls"] += 1
+            totals["wall_s"] += wall
+            totals["cpu_s"] += cpu
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Stop collecting, print the breakdown table and write the report; returns the report.
+        """
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        staged = sum(totals["wall_s"] for totals in self.stages.values())
+        report: Dict[str, Any] = {
+            "command": self.command,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "stages": {
+                name: {"calls": int(totals["calls"]), "wall_s": round(totals["wall_s"], 4), "cpu_s": round(totals["cpu_s"], 4)}
+                for name, totals in sorted(self.stages.items(), key=lambda item: -item[1]["wall_s"])
+            },
+            "other_wall_s": round(max(wall - staged, 0.0), 4),
+        }
+        if self._memory:
+            report["memory"] = self._memory_report()
+        if self._cprofile is not None:
+            report["cprofile"] = self._cprofile_report()
+        self._print(report)
+        if self.report_file is not None:
+            with self.report_file.open("w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+            print(f"Wrote profile report to {self.report_file}.", file=sys.stderr)
+        return report
+
+    def _memory_report(self) -> Dict[str, Any]:
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+        tracemalloc.stop()
+        return {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_sites": [{"site": str(stat.traceback), "bytes": stat.size, "blocks": stat.count} for stat in top],
+        }
+
+    def _cprofile_report(self) -> Dict[str, Any]:
+        import pstats
+
+        result: Dict[str, Any] = {}
+        if self.report_file is not None:
+            path = self.report_file.with_suffix(".pstats")
+            self._cprofile.dump_stats(str(path))
+            result["stats_file"] = str(path)
+        stats = pstats.Stats(self._cprofile)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:15]
+        result["top_cumulative"] = [
+            {"function": f"{filename}:{line}({name})", "calls": calls, "tottime_s": round(tottime, 4), "cumtime_s": round(cumtime, 4)}
+            for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+        ]
+        return result
+
+    @staticmethod
+    def _print(report: Dict[str, Any]) -> None:
+        wall = report["wall_s"] or 1e-9
+        rows = [(name, totals["calls"], totals["wall_s"], totals["cpu_s"]) for name, totals in report["stages"].items()]
+        rows.append(("other", "", report["other_wall_s"], None))
+        print(f"{'stage':<12} {'calls':>7} {'wall s':>9} {'share':>6} {'cpu s':>9}", file=sys.stderr)
+        for name, calls, stage_wall, stage_cpu in rows:
+            cpu_text = f"{stage_cpu:9.3f}" if stage_cpu is not None else " " * 9
+            print(f"{name:<12} {calls:>7} {stage_wall:9.3f} {stage_wall / wall:6.1%} {cpu_text}", file=sys.stderr)
+        print(f"{'total':<12} {'':>7} {report['wall_s']:9.3f} {'':>6} {report['cpu_s']:9.3f}", file=sys.stderr)
+        if "memory" in report:
+            print(f"Peak traced memory: {report['memory']['peak_bytes'] / 1048576:.1f} MiB", file=sys.stderr)
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """
+    Time a block as stage `name` when profiling is on; a no-op otherwise.
+    """
+    profiler = _active
+    return profiler.stage(name) if profiler is not None else _NULL
+
+
+def iter_stage(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """
+    Yield from `iterable`, timing each step of the iteration as stage `name`.
+    """
+    if _active is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def profiling() -> bool:
+    return _active is not None
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time load/build/serialize/network/process stages and print a breakdown at exit.",
+    )
+    parser.add_argument(
+        "--profile-report",
+        type=Path,
+        default=Path("client-api-profile.json"),
+        help="JSON report written by --profile (default: client-api-profile.json).",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        action="store_true",
+        help="With --profile, also run cProfile (stats saved next to the report).",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also trace allocations with tracemalloc (slower).",
+    )
+
+
+def start_profiling(args: argparse.Namespace) -> Optional[Profiler]:
+    """
+    Start a profiler for --profile; the report is produced when the command or process ends.
+
+    Any profiler left from an earlier command in the same process is finished
+    first, with or without --profile, so its report never absorbs this command.
+    """
+    global _active, _exit_registered
+    finish_profiling()
+    if not args.profile:
+        return None
+    _active = Profiler(args.profile_report, cprofile=args.profile_cprofile, memory=args.profile_memory, command=_command)
+    _active.start()
+    if not _exit_registered:
+        atexit.register(finish_profiling)
+        _exit_registered = True
+    return _active
+
+
+def finish_profiling() -> None:
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.finish()
+
+
+@contextlib.contextmanager
+def command_scope(name: str) -> Iterator[None]:
+    """
+    Run one `client_api.py` command: its profile report is named `name` and written when it returns.
+    """
+    global _command
+    finish_profiling()
+    _command = name
+    try:
+        yield
+    finally:
+        finish_profiling()
+        _command = None
+
+
+__all__ = [
+    "Profiler",
+    "add_profile_arguments",
+    "command_scope",
+    "finish_profiling",
+    "iter_stage",
+    "profiling",
+    "stage",
+    "start_profiling",
+]
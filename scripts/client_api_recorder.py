@@ -0,0 +1,179 @@
+"""
+Structured JSONL recorder for requests sent through ClientApiSession.
+
+Each sampled request becomes one line:
+
+    {"ts": 1.042, "at": 1760869200.5, "method": "PUT", "path": "/adverts/42",
+     "endpoint": "/adverts/{advert_id}", "params": null, "status": 200,
+     "duration_ms": 84.1, "request_bytes": 1893, "response_bytes": 1720}
+
+plus `body` when bodies are recorded and `error` for failed requests. The format
+is what client_api_replay.py reads, so a recording doubles as a benchmark input;
+replay skips writes without a `body`, so record with --record-bodies to replay them.
+Headers (and therefore credentials) are never written.
+
+`record()` only builds a small dict and hands it to a bounded queue; a
+background thread serialises and writes it. When the queue is full the entry is
+dropped and counted rather than blocking the request. Files rotate like
+logging.handlers.RotatingFileHandler: `path` -> `path.1` -> ... -> `path.N`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    from requests import Response
+
+REDACTED = "***"
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Collapse IDs in a request path, e.g. /adverts/42/media -> /adverts/{advert_id}/media.
+    """
+    segments = path.split("/")
+    for index in range(1, len(segments)):
+        if segments[index - 1] == "adverts" and segments[index] and not segments[index].startswith("bulk-"):
+            segments[index] = "{advert_id}"
+    return "/".join(segments)
+
+
+def redact(value: Any, keys: frozenset) -> Any:
+    if not keys:
+        return value
+    if isinstance(value, dict):
+        return {key: REDACTED if key in keys else redact(item, keys) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, keys) for item in value]
+    return value
+
+
+def _body_size(response: Optional["Response"]) -> int:
+    request = getattr(response, "request", None)
+    body = getattr(request, "body", None)
+    if body is None or hasattr(body, "read"):
+        return 0
+    return len(body)
+
+
+class RequestRecorder:
+    def __init__(
+        self,
+        path: Path,
+        sample_rate: float = 1.0,
+        include_bodies: bool = False,
+        redact_keys: Iterable[str] = (),
+        max_bytes: int = 0,
+        backup_count: int = 5,
+        queue_size: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.include_bodies = include_bodies
+        self.redact_keys = frozenset(redact_keys)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.dropped = 0
+        self.written = 0
+        self._started = time.monotonic()
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="client-api-recorder", daemon=True)
+        self._thread.start()
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        params: Any,
+        body: Any,
+        response: Optional["Response"],
+        duration: float,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Queue one request for writing; never blocks. `body` must not be mutated afterwards.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        entry = {
+            "ts": time.monotonic() - self._started,
+            "at": time.time(),
+            "method": method,
+            "path": path,
+            "params": params,
+            "status": response.status_code if response is not None else None,
+            "duration_ms": duration * 1000,
+            "request_bytes": _body_size(response),
+            "response_bytes": len(response.content) if response is not None else 0,
+            "_body": body if self.include_bodies else None,
+            "_redact": self.redact_keys,
+        }
+        if error:
+            entry["error"] = error
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """
+        Flush queued entries and stop the writer thread.
+        """
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped:
+            print(f"Recorder dropped {self.dropped} entr(ies); the queue was full.", file=sys.stderr)
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            self.path.unlink()
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def _run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle = self.path.open("a", encoding="utf-8")
+        size = handle.tell()
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    return
+                body = entry.pop("_body")
+                redact_keys = entry.pop("_redact")
+                entry["endpoint"] = endpoint_template(entry["path"])
+                entry["duration_ms"] = round(entry["duration_ms"], 1)
+                entry["ts"] = round(entry["ts"], 3)
+                if body is not None:
+                    entry["body"] = redact(body, redact_keys)
+                line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False, default=str) + "\n"
+                encoded = len(line.encode("utf-8"))
+                if self.max_bytes and size and size + encoded > self.max_bytes:
+                    handle.close()
+                    self._rotate()
+                    handle = self.path.open("a", encoding="utf-8")
+                    size = 0
+                handle.write(line)
+                size += encoded
+                self.written += 1
+                if self._queue.empty():
+                    handle.flush()
+        finally:
+            handle.close()
+
+
+__all__ = ["RequestRecorder", "endpoint_template", "redact"]
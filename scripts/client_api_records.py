@@ -0,0 +1,317 @@
+"""
+Compact record types for processing large advert and order inventories.
+
+A decoded advert from GET /api/v1/adverts is a tree of dicts and lists; a few
+hundred thousand of them do not fit comfortably in memory. `AdvertRecord`
+keeps the fields that reports filter on in `__slots__` attributes, interns the
+small enum-like strings, and stores the bulky nested sections (`media`,
+`features`) and any remaining fields as compact JSON text that is only decoded
+when accessed. `to_dict()` rebuilds the original payload: keys the source did
+not have are not added, and empty sections (`"media": {}`) or explicit nulls
+(`"price": {"overall": null}`) it did have are kept. Attributes are None both
+when a field is absent and when it is null; the difference lives in the JSON.
+
+The paginator helpers walk every page of a list endpoint, and the NDJSON
+helpers read and write one record per line (see `client_api_export_adverts.py`).
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from client_api_session import ClientApiSession
+
+_COMPACT = {"separators": (",", ":"), "ensure_ascii": False}
+_MISSING = object()
+
+
+def _pack(value: Any, keep_empty: bool = False) -> Optional[str]:
+    """
+    Encode `value` as compact JSON; None when it is missing, or empty unless `keep_empty`.
+    """
+    if value is _MISSING or (not keep_empty and (value is None or value == {} or value == [])):
+        return None
+    text = json.dumps(value, **_COMPACT)
+    # "{}", "[]" and "null" are shared instead of stored once per record.
+    return sys.intern(text) if len(text) <= 4 else text
+
+
+def _unpack(text: Optional[str], default: Any) -> Any:
+    return json.loads(text) if text is not None else default
+
+
+def _intern(value: Any) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+def _take(data: Dict[str, Any], key: str) -> Any:
+    """
+    Pop `key` unless it is null; null values stay in `data` so they round-trip.
+    """
+    return data.pop(key) if data.get(key) is not None else None
+
+
+def _split(section: Any, keys: Iterable[str]) -> tuple:
+    """
+    Pull the non-null `keys` out of a nested dict, returning their values plus what to keep.
+
+    The leftover is `_MISSING` when nothing is left to keep; otherwise it is the
+    rest of the section (null keys included, `{}` if the source section was
+    empty) or the section itself when it is not a dict.
+    """
+    keys = tuple(keys)
+    if not isinstance(section, dict):
+        return tuple(None for _ in keys) + (section,)
+    rest = dict(section)
+    values = tuple(rest.pop(key) if rest.get(key) is not None else None for key in keys)
+    if not rest and any(value is not None for value in values):
+        rest = _MISSING
+    return values + (rest,)
+
+
+class AdvertRecord:
+    __slots__ = (
+        "advert_id",
+        "title",
+        "advert_type",
+        "reality_type",
+        "currency",
+        "price",
+        "lat",
+        "lon",
+        "is_published",
+        "is_processed",
+        "_media",
+        "_features",
+        "_extra",
+    )
+
+    def __init__(
+        self,
+        advert_id: Optional[str],
+        title: Optional[str] = None,
+        advert_type: Optional[str] = None,
+        reality_type: Optional[str] = None,
+        currency: Optional[str] = None,
+        price: Optional[float] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        is_published: Optional[bool] = None,
+        is_processed: Optional[bool] = None,
+        media: Optional[str] = None,
+        features: Optional[str] = None,
+        extra: Optional[str] = None,
+    ) -> None:
+        self.advert_id = advert_id
+        self.title = title
+        self.advert_type = advert_type
+        self.reality_type = reality_type
+        self.currency = currency
+        self.price = price
+        self.lat = lat
+        self.lon = lon
+        self.is_published = is_published
+        self.is_processed = is_processed
+        self._media = media
+        self._features = features
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "AdvertRecord":
+        data = dict(payload)
+        is_published, is_processed, status_rest = _split(data.pop("status", _MISSING), ("is_published", "is_processed"))
+        overall, price_rest = _split(data.pop("price", _MISSING), ("overall",))
+        lat, lon, location_rest = _split(data.pop("location", _MISSING), ("lat", "lon"))
+        advert_id = _take(data, "advert_id")
+        record = cls(
+            advert_id=str(advert_id) if advert_id is not None else None,
+            title=_take(data, "title"),
+            advert_type=_intern(_take(data, "advert_type")),
+            reality_type=_intern(_take(data, "reality_type")),
+            currency=_intern(_take(data, "currency")),
+            price=overall,
+            lat=lat,
+            lon=lon,
+            is_published=bool(is_published) if is_published is not None else None,
+            is_processed=bool(is_processed) if is_processed is not None else None,
+            media=_pack(data.pop("media", _MISSING), keep_empty=True),
+            features=_pack(data.pop("features", _MISSING), keep_empty=True),
+        )
+        for key, rest in (("status", status_rest), ("price", price_rest), ("location", location_rest)):
+            if rest is not _MISSING:
+                data[key] = rest
+        record._extra = _pack(data)
+        return record
+
+    @classmethod
+    def from_json(cls, line: str) -> "AdvertRecord":
+        return cls.from_dict(json.loads(line))
+
+    @property
+    def media(self) -> Dict[str, List[str]]:
+        """
+        Media URLs by type, decoded on every access (nothing is cached on the record).
+        """
+        return _unpack(self._media, None) or {}
+
+    @property
+    def features(self) -> Dict[str, Any]:
+        return _unpack(self._features, None) or {}
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        return _unpack(self._extra, {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.extra
+        if self.advert_id is not None:
+            data["advert_id"] = self.advert_id
+        for key in ("title", "advert_type", "reality_type", "currency"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        if self.price is not None:
+            data["price"] = {**data.get("price", {}), "overall": self.price}
+        for section, fields in (
+            ("location", (("lat", self.lat), ("lon", self.lon))),
+            ("status", (("is_published", self.is_published), ("is_processed", self.is_processed))),
+        ):
+            present = {key: value for key, value in fields if value is not None}
+            if present:
+                data[section] = {**data.get(section, {}), **present}
+        if self._media is not None:
+            data["media"] = json.loads(self._media)
+        if self._features is not None:
+            data["features"] = json.loads(self._features)
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), **_COMPACT)
+
+    def __repr__(self) -> str:
+        return f"AdvertRecord(advert_id={self.advert_id!r}, title={self.title!r})"
+
+
+class OrderRecord:
+    __slots__ = ("order_id", "uid", "status", "package_count", "_packages", "_extra")
+
+    def __init__(
+        self,
+        order_id: Optional[str],
+        status: Optional[str] = None,
+        package_count: int = 0,
+        packages: Optional[str] = None,
+        extra: Optional[str] = None,
+        uid: Optional[str] = None,
+    ) -> None:
+        self.order_id = order_id
+        self.uid = uid
+        self.status = status
+        self.package_count = package_count
+        self._packages = packages
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "OrderRecord":
+        data = dict(payload)
+        order_id = _take(data, "order_id")
+        uid = _take(data, "uid")
+        packages = data.pop("packages", _MISSING)
+        return cls(
+            order_id=str(order_id) if order_id is not None else None,
+            uid=str(uid) if uid is not None else None,
+            status=_intern(_take(data, "status")),
+            package_count=len(packages) if isinstance(packages, list) else 0,
+            packages=_pack(packages, keep_empty=True),
+            extra=_pack(data),
+        )
+
+    @property
+    def key(self) -> Optional[str]:
+        """
+        The order's identifier: `order_id`, or `uid` for orders that only have that.
+        """
+        return self.order_id if self.order_id is not None else self.uid
+
+    @property
+    def packages(self) -> List[Dict[str, Any]]:
+        return _unpack(self._packages, None) or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = _unpack(self._extra, {})
+        if self.order_id is not None:
+            data["order_id"] = self.order_id
+        if self.uid is not None:
+            data["uid"] = self.uid
+        if self.status is not None:
+            data["status"] = self.status
+        if self._packages is not None:
+            data["packages"] = json.loads(self._packages)
+        return data
+
+    def __repr__(self) -> str:
+        return f"OrderRecord(order_id={self.key!r}, status={self.status!r})"
+
+
+def iter_pages(
+    api: "ClientApiSession",
+    path: str,
+    page_size: int = 100,
+    params: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every page of a paged list endpoint, following `meta.page_count`.
+    """
+    page = 1
+    while True:
+        payload = api.json("GET", path, params={**(params or {}), "page": page, "page_size": page_size})
+        if not payload:
+            return
+        yield payload
+        page_count = payload.get("meta", {}).get("page_count") or 0
+        if page >= page_count:
+            return
+        page += 1
+
+
+def iter_advert_records(api: "ClientApiSession", page_size: int = 100) -> Iterator[AdvertRecord]:
+    for payload in iter_pages(api, "/adverts", page_size=page_size):
+        for advert in payload.get("adverts", []):
+            yield AdvertRecord.from_dict(advert)
+
+
+def iter_order_records(api: "ClientApiSession", page_size: int = 100, sort: str = "desc") -> Iterator[OrderRecord]:
+    for payload in iter_pages(api, "/orders", page_size=page_size, params={"sort": sort}):
+        for order in payload.get("orders", []):
+            yield OrderRecord.from_dict(order)
+
+
+def write_advert_ndjson(records: Iterable[AdvertRecord], path: Path) -> int:
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(record.to_json())
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def read_advert_ndjson(path: Path) -> Iterator[AdvertRecord]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield AdvertRecord.from_json(line)
+
+
+__all__ = [
+    "AdvertRecord",
+    "OrderRecord",
+    "iter_pages",
+    "iter_advert_records",
+    "iter_order_records",
+    "write_advert_ndjson",
+    "read_advert_ndjson",
+]
@@ -0,0 +1,282 @@
+"""
+Replay recorded Client API traffic against a target for load and soak testing.
+
+Input is JSONL, one request per line, as written by the request recorder
+(--record-file):
+
+    {"ts": 0.0, "method": "GET", "path": "/adverts", "params": {"page": 1}}
+    {"ts": 0.4, "method": "POST", "path": "/adverts/bulk-create", "body": {"adverts": [...]}}
+
+`ts` is seconds since the start of the recording; requests are replayed on
+that schedule divided by --speedup (0 sends as fast as the workers allow).
+`body` is sent as JSON when present. POST, PUT and PATCH requests recorded
+without a body are skipped (with a count), so replaying writes needs a
+recording made with --record-bodies. Point --base-url at a local mock or at
+staging, never at production data you care about.
+
+Every --report-every seconds a line with throughput, latency percentiles,
+errors and process memory (RSS) is printed; the final summary covers the
+whole run and can be written to --report-file as JSON.
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from client_api_session import ClientApiSession, build_parser, config_from_args
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+def read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "method" not in record or "path" not in record:
+                raise ValueError(f"{path}:{line_number}: record needs 'method' and 'path'.")
+            yield record
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    Current resident set size, or None where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def replayable(record: Dict[str, Any]) -> bool:
+    """
+    False for writes recorded without a body; sending them empty would only measure 4xx/5xx.
+    """
+    return record["method"].upper() not in WRITE_METHODS or record.get("body") is not None
+
+
+@dataclass
+class ReplayStats:
+    started: float = field(default_factory=time.monotonic)
+    latencies: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    memory: List[Tuple[float, int]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, latency: float, error: Optional[str]) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            if error:
+                self.errors[error] += 1
+
+    def snapshot(self, since: int) -> Tuple[List[float], int]:
+        with self.lock:
+            return self.latencies[since:], len(self.latencies)
+
+    def summary(self, latencies: List[float], seconds: float) -> Dict[str, Any]:
+        ordered = sorted(latencies)
+        return {
+            "requests": len(ordered),
+            "throughput_rps": round(len(ordered) / seconds, 2) if seconds > 0 else 0.0,
+            "latency_ms": {
+                name: round(percentile(ordered, fraction) * 1000, 1)
+                for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+            },
+        }
+
+
+def classify(exc: Exception) -> str:
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return f"HTTP {response.status_code}"
+    return type(exc).__name__
+
+
+def worker(api: ClientApiSession, jobs: "queue.Queue[Optional[Dict[str, Any]]]", stats: ReplayStats, timeout: float) -> None:
+    while True:
+        record = jobs.get()
+        if record is None:
+            return
+        kwargs: Dict[str, Any] = {}
+        if record.get("params"):
+            kwargs["params"] = record["params"]
+        if record.get("body") is not None:
+            kwargs["json"] = record["body"]
+        error = None
+        start = time.perf_counter()
+        try:
+            api.request(record["method"], record["path"], timeout=timeout, **kwargs)
+        except Exception as exc:  # noqa: BLE001 - every failure is a data point
+            error = classify(exc)
+        stats.add(time.perf_counter() - start, error)
+
+
+def reporter(stats: ReplayStats, interval: float, done: threading.Event) -> None:
+    seen = 0
+    last = time.monotonic()
+    while not done.wait(interval):
+        now = time.monotonic()
+        window, seen = stats.snapshot(seen)
+        rss = rss_bytes()
+        if rss is not None:
+            stats.memory.append((now - stats.started, rss))
+        summary = stats.summary(window, now - last)
+        latency = summary["latency_ms"]
+        memory = f"{rss / 1048576:.1f} MiB" if rss is not None else "n/a"
+        print(
+            f"[{now - stats.started:8.1f}s] {summary['requests']} req, {summary['throughput_rps']} req/s, "
+            f"p50 {latency['p50']} ms, p99 {latency['p99']} ms, "
+            f"errors total {sum(stats.errors.values())}, rss {memory}",
+            flush=True,
+        )
+        last = now
+
+
+def schedule(records: List[Dict[str, Any]], speedup: float, duration: Optional[float]) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """
+    Yield (offset seconds, record) pairs, looping over the log until `duration` when given.
+    """
+    if not records:
+        return
+    base = float(records[0].get("ts", 0.0))
+    span = float(records[-1].get("ts", 0.0)) - base
+    # Keep the recorded pacing between loops (one extra gap of the mean spacing);
+    # logs without usable timestamps repeat once per recorded second instead of
+    # looping at offset 0 forever.
+    loop_gap = span + span / max(len(records) - 1, 1) if span > 0 else 1.0
+    loop_offset = 0.0
+    while True:
+        for record in records:
+            offset = 0.0 if speedup <= 0 else (loop_offset + float(record.get("ts", 0.0)) - base) / speedup
+            if duration is not None and offset > duration:
+                return
+            yield offset, record
+        if duration is None:
+            return
+        loop_offset += loop_gap
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser("Replay recorded request logs (JSONL) against a target.")
+    parser.add_argument("--log-file", type=Path, required=True, help="Recorded requests, one JSON object per line.")
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=1.0,
+        help="Divide recorded gaps by this factor; 0 replays as fast as possible (default: 1).",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel workers (default: 4).")
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Soak mode: loop over the log until this many seconds have been scheduled.",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines.")
+    parser.add_argument("--report-file", type=Path, default=None, help="Write the final summary as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1.")
+    if args.duration is not None and args.speedup <= 0:
+        parser.error("--duration needs a positive --speedup to pace the loop.")
+
+    config = config_from_args(args)
+    records = list(read_records(args.log_file))
+    if not records:
+        raise ValueError(f"No requests found in {args.log_file}.")
+    skipped = sum(1 for record in records if not replayable(record))
+    if skipped:
+        records = [record for record in records if replayable(record)]
+        print(
+            f"Skipping {skipped} write request(s) recorded without a body; "
+            "record with --record-bodies to replay them.",
+            file=sys.stderr,
+        )
+        if not records:
+            raise ValueError(f"Nothing to replay from {args.log_file}: every request is a write without a body.")
+
+    stats = ReplayStats()
+    jobs: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=args.concurrency * 2)
+    workers = [
+        threading.Thread(
+            target=worker,
+            args=(ClientApiSession.from_config(config), jobs, stats, args.timeout),
+            daemon=True,
+        )
+        for _ in range(args.concurrency)
+    ]
+    done = threading.Event()
+    progress = threading.Thread(target=reporter, args=(stats, args.report_every, done), daemon=True)
+    for thread in workers:
+        thread.start()
+    progress.start()
+
+    start_rss = rss_bytes()
+    behind = 0
+    try:
+        for offset, record in schedule(records, args.speedup, args.duration):
+            delay = stats.started + offset - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -1.0:
+                behind += 1
+            jobs.put(record)
+    except KeyboardInterrupt:
+        print("Interrupted; waiting for in-flight requests.", file=sys.stderr)
+    finally:
+        for _ in workers:
+            jobs.put(None)
+        for thread in workers:
+            thread.join()
+        done.set()
+        progress.join()
+
+    elapsed = time.monotonic() - stats.started
+    summary = stats.summary(stats.latencies, elapsed)
+    end_rss = rss_bytes()
+    summary.update({
+        "elapsed_s": round(elapsed, 1),
+        "errors": dict(stats.errors),
+        "late_sends": behind,
+        "rss_start_bytes": start_rss,
+        "rss_end_bytes": end_rss,
+        "rss_samples": stats.memory,
+    })
+
+    latency = summary["latency_ms"]
+    print(f"Replayed {summary['requests']} request(s) in {summary['elapsed_s']} s ({summary['throughput_rps']} req/s).")
+    print(f"Latency ms: p50 {latency['p50']}, p90 {latency['p90']}, p99 {latency['p99']}, max {latency['max']}")
+    if stats.errors:
+        print("Errors: " + ", ".join(f"{name} x{count}" for name, count in stats.errors.most_common()))
+    if behind:
+        print(f"{behind} request(s) were sent more than 1 s late; the target or workers could not keep up.")
+    if start_rss is not None and end_rss is not None:
+        print(f"RSS drift: {(end_rss - start_rss) / 1048576:+.1f} MiB")
+    if args.report_file:
+        with args.report_file.open("w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+        print(f"Wrote report to {args.report_file}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Local request scheduler that shares one account's rate budget between commands.
+
+Run the daemon once per machine (or per office gateway):
+
+    python scripts/client_api_scheduler.py --listen 127.0.0.1:8765
+
+and point every command at it with --scheduler-address (env: CLIENT_API_SCHEDULER).
+Before each request the session asks the daemon for a grant and waits for it.
+The daemon hands out at most --rate-limit grants per --rate-window seconds per
+account, so commands sharing an account stop racing each other into 429s.
+
+Waiting requests are queued by priority class:
+
+- interactive: single-advert commands (the default),
+- bulk: bulk and feed commands,
+- background: exports and other work nobody is waiting for.
+
+When several classes are waiting, the next grant goes to the class with the
+fewest grants in the current window relative to its weight (--weights, default
+8:3:1), so an interactive call overtakes a queued bulk job while bulk still
+outpaces background work. The last --reserve grants of every window are kept
+for interactive requests, so an urgent call never waits a whole window behind a
+bulk job. A 429 seen by any client pauses that account for its Retry-After.
+
+Messages are small JSON documents over multiprocessing.connection; set
+CLIENT_API_SCHEDULER_KEY on the daemon and the clients to require a shared key.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+PRIORITIES = ("interactive", "bulk", "background")
+DEFAULT_WEIGHTS = {"interactive": 8, "bulk": 3, "background": 1}
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Scheduler address must look like HOST:PORT, got {value!r}.")
+    return host, int(port)
+
+
+def _authkey() -> Optional[bytes]:
+    key = os.getenv("CLIENT_API_SCHEDULER_KEY")
+    return key.encode("utf-8") if key else None
+
+
+class _Account:
+    def __init__(self) -> None:
+        self.grants: Deque[Tuple[float, str]] = deque()
+        self.waiting: Dict[str, Deque[object]] = {priority: deque() for priority in PRIORITIES}
+        self.paused_until = 0.0
+
+
+class Scheduler:
+    def __init__(
+        self,
+        rate_limit: int = 120,
+        rate_window: float = 60.0,
+        reserve: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        if rate_limit < 1 or not 0 <= reserve < rate_limit:
+            raise ValueError("Rate limit must be at least 1 and the reserve below it.")
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.reserve = reserve
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.granted: Counter = Counter()
+        self._accounts: Dict[str, _Account] = {}
+        self._cond = threading.Condition()
+
+    def _next(self, account: _Account, now: float) -> Tuple[Optional[object], Optional[float]]:
+        """
+        Return (ticket to grant now, None) or (None, seconds until the budget changes).
+        """
+        while account.grants and account.grants[0][0] <= now - self.rate_window:
+            account.grants.popleft()
+        if now < account.paused_until:
+            return None, account.paused_until - now
+        used = len(account.grants)
+        recent = Counter(priority for _, priority in account.grants)
+        candidates = []
+        for rank, priority in enumerate(PRIORITIES):
+            if not account.waiting[priority]:
+                continue
+            cap = self.rate_limit if priority == "interactive" else self.rate_limit - self.reserve
+            if used < cap:
+                candidates.append((recent[priority] / self.weights[priority], rank, priority))
+        if candidates:
+            return account.waiting[min(candidates)[2]][0], None
+        if account.grants:
+            return None, account.grants[0][0] + self.rate_window - now
+        return None, None
+
+    def acquire(self, account_key: str, priority: str) -> float:
+        """
+        Block until a request of `priority` may be sent for `account_key`; return the seconds waited.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}.")
+        started = time.monotonic()
+        ticket = object()
+        with self._cond:
+            account = self._accounts.setdefault(account_key, _Account())
+            account.waiting[priority].append(ticket)
+            self._cond.notify_all()
+            while True:
+                now = time.monotonic()
+                chosen, wait = self._next(account, now)
+                if chosen is ticket:
+                    account.waiting[priority].popleft()
+                    account.grants.append((now, priority))
+                    self.granted[priority] += 1
+                    self._cond.notify_all()
+                    return now - started
+                self._cond.wait(wait)
+
+    def backoff(self, account_key: str, seconds: float) -> None:
+        """
+        Stop granting requests for `account_key` for `seconds` (after a 429).
+        """
+        with self._cond:
+            account = self._accounts.setdefault(account_key, _Account())
+            account.paused_until = max(account.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "granted": {priority: self.granted[priority] for priority in PRIORITIES},
+                "accounts": {
+                    key: {
+                        "in_window": sum(1 for at, _ in account.grants if at > now - self.rate_window),
+                        "waiting": {priority: len(queue) for priority, queue in account.waiting.items()},
+                        "paused_s": round(max(account.paused_until - now, 0.0), 1),
+                    }
+                    for key, account in self._accounts.items()
+                },
+            }
+
+
+def _handle(connection: Any, scheduler: Scheduler) -> None:
+    with connection:
+        while True:
+            try:
+                message = json.loads(connection.recv_bytes())
+            except (EOFError, OSError, ValueError):
+                return
+            operation = message.get("op")
+            try:
+                if operation == "acquire":
+                    reply = {"waited": scheduler.acquire(str(message["account"]), message["priority"])}
+                elif operation == "backoff":
+                    scheduler.backoff(str(message["account"]), float(message["seconds"]))
+                    reply = {}
+                elif operation == "status":
+                    reply = scheduler.status()
+                else:
+                    reply = {"error": f"Unknown operation {operation!r}."}
+            except (KeyError, TypeError, ValueError) as exc:
+                reply = {"error": str(exc)}
+            try:
+                connection.send_bytes(json.dumps(reply).encode("utf-8"))
+            except OSError:
+                return
+
+
+def serve(address: str, scheduler: Scheduler) -> None:
+    from multiprocessing.connection import Listener
+    from multiprocessing import AuthenticationError
+
+    with Listener(parse_address(address), authkey=_authkey()) as listener:
+        print(
+            f"Scheduling requests on {address}: {scheduler.rate_limit} per {scheduler.rate_window:g} s "
+            f"per account, {scheduler.reserve} reserved for interactive.",
+            flush=True,
+        )
+        while True:
+            try:
+                connection = listener.accept()
+            except (AuthenticationError, OSError) as exc:
+                print(f"Rejected connection: {exc}", file=sys.stderr)
+                continue
+            threading.Thread(target=_handle, args=(connection, scheduler), daemon=True).start()
+
+
+class SchedulerClient:
+    """
+    Client side of the scheduler; keeps one connection per thread and reconnects
+    once when the daemon has gone away (e.g. after a restart).
+    """
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self._local = threading.local()
+
+    def _connect(self) -> Any:
+        from multiprocessing.connection import Client
+
+        try:
+            connection = Client(parse_address(self.address), authkey=_authkey())
+        except OSError as exc:
+            raise SystemExit(f"Cannot reach the request scheduler at {self.address}: {exc}") from exc
+        self._local.connection = connection
+        return connection
+
+    def _drop(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+    def _call(self, **message: Any) -> Dict[str, Any]:
+        data = json.dumps(message).encode("utf-8")
+        connection = getattr(self._local, "connection", None)
+        fresh = connection is None
+        if fresh:
+            connection = self._connect()
+        try:
+            connection.send_bytes(data)
+            raw = connection.recv_bytes()
+        except (EOFError, OSError) as exc:
+            # The daemon restarted (or dropped us): reconnect once, unless this connection was new.
+            self._drop()
+            if fresh:
+                raise SystemExit(f"Cannot reach the request scheduler at {self.address}: {exc!r}") from exc
+            connection = self._connect()
+            try:
+                connection.send_bytes(data)
+                raw = connection.recv_bytes()
+            except (EOFError, OSError) as retry_exc:
+                self._drop()
+                raise SystemExit(f"Cannot reach the request scheduler at {self.address}: {retry_exc!r}") from retry_exc
+        reply = json.loads(raw)
+        if "error" in reply:
+            raise ValueError(f"Scheduler error: {reply['error']}")
+        return reply
+
+    def acquire(self, account: str, priority: str) -> float:
+        return self._call(op="acquire", account=account, priority=priority)["waited"]
+
+    def backoff(self, account: str, seconds: float) -> None:
+        self._call(op="backoff", account=account, seconds=seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return self._call(op="status")
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    parts = value.split(":")
+    if len(parts) != len(PRIORITIES):
+        raise argparse.ArgumentTypeError("Weights must look like 8:3:1 (interactive:bulk:background).")
+    try:
+        weights = {priority: float(part) for priority, part in zip(PRIORITIES, parts)}
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    if min(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("Weights must be positive.")
+    return weights
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the local request scheduler daemon (or query it).")
+    parser.add_argument(
+        "--listen",
+        default=os.getenv("CLIENT_API_SCHEDULER", DEFAULT_ADDRESS),
+        help=f"HOST:PORT to listen on (env: CLIENT_API_SCHEDULER, default: {DEFAULT_ADDRESS}).",
+    )
+    parser.add_argument("--rate-limit", type=int, default=120, help="Requests per window per account (default: 120).")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Window in seconds (default: 60).")
+    parser.add_argument(
+        "--reserve",
+        type=int,
+        default=10,
+        help="Grants per window only interactive requests may use (default: 10).",
+    )
+    parser.add_argument(
+        "--weights",
+        type=_parse_weights,
+        default=DEFAULT_WEIGHTS,
+        help="Fair-share weights interactive:bulk:background (default: 8:3:1).",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Print the status of the daemon running at --listen and exit.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.status:
+        print(json.dumps(SchedulerClient(args.listen).status(), indent=2, sort_keys=True))
+        return
+    try:
+        scheduler = Scheduler(args.rate_limit, args.rate_window, args.reserve, args.weights)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        serve(args.listen, scheduler)
+    except KeyboardInterrupt:
+        print("Scheduler stopped.")
+
+
+__all__ = ["PRIORITIES", "Scheduler", "SchedulerClient", "parse_address", "serve"]
+
+
+if __name__ == "__main__":
+    main()
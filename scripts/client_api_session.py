@@ -4,18 +4,140 @@ Reusable HTTP helper + CLI utilities for the Client API tutorials.
 Every tutorial exposes `--base-url`, `--basic-user`, `--basic-password`,
 `--account-uid`, and `--api-key` flags, each defaulting to the similarly named
 environment variable (base-url defaults to http://localhost:8081/api/v1).
+
+`requests` is imported lazily when the first session is built so that `--help`
+and argument errors stay fast, and `enable_session_pool()` lets a long-running
+caller (see `client_api.py batch`) reuse one warm HTTP session per credential set.
+
+`--cache-dir` (env: CLIENT_API_CACHE_DIR) enables the on-disk GET cache from
+`client_api_cache.py`; `--cache-ttl` sets how long responses without validators
+stay fresh and `--cache-stats` prints the hit/miss summary on exit.
+
+`--record-file` (env: CLIENT_API_RECORD_FILE) writes every request as JSONL
+through `client_api_recorder.py`, with `--record-sample`, `--record-bodies`,
+`--record-redact` and `--record-max-bytes` controlling what is kept.
+
+`--gzip-requests` (env: CLIENT_API_GZIP_REQUESTS=1) sends JSON bodies of 1 KiB
+or more gzip-compressed (see `client_api_payload.py`); if the server answers
+415 Unsupported Media Type the request is repeated uncompressed and compression
+stays off for that session.
+
+`--scheduler-address` (env: CLIENT_API_SCHEDULER) makes every request wait for a
+grant from the local scheduler daemon in `client_api_scheduler.py`, which shares
+the account's rate budget between commands by `--priority` class. Without it,
+commands that take --rate-limit/--rate-window (the bulk and feed commands) pace
+their own requests to that window, exactly as their --plan projects.
+A 429 response is retried up to MAX_429_RETRIES times after its Retry-After.
+
+Requests are timed in `serialize`, `network`, `process` and `wait` stages (and
+importing requests as `setup`) when a script runs with --profile (see `client_api_profile.py`).
 """
 from __future__ import annotations
 
 import argparse
+import atexit
+import contextlib
 import json
 import os
+import sys
+import time
+from pathlib import Path
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from client_api_profile import profiling, stage
+
+if TYPE_CHECKING:
+    import requests
+    from requests import Response
+
+    from client_api_cache import ResponseCache
+    from client_api_plan import RateWindow
+    from client_api_recorder import RequestRecorder
+    from client_api_scheduler import SchedulerClient
+
+_session_pool: Optional[Dict[Tuple[str, str, str, str], "requests.Session"]] = None
+
+MAX_429_RETRIES = 3
+
+
+def enable_session_pool() -> None:
+    """
+    Reuse one requests.Session per credential set for the rest of the process.
+    """
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = {}
+
+
+_caches: Dict[str, "ResponseCache"] = {}
+
+
+def _shared_cache(directory: str, ttl: float, report: bool) -> "ResponseCache":
+    cache = _caches.get(directory)
+    if cache is None:
+        from client_api_cache import ResponseCache
+
+        cache = ResponseCache(Path(directory), ttl=ttl)
+        _caches[directory] = cache
+        if report:
+            atexit.register(cache.report)
+    cache.ttl = ttl
+    return cache
+
 
-import requests
-from requests import Response
-from requests.auth import HTTPBasicAuth
+_recorders: Dict[str, "RequestRecorder"] = {}
+
+
+def _shared_recorder(config: "ClientApiConfig") -> "RequestRecorder":
+    recorder = _recorders.get(config.record_file)
+    if recorder is None:
+        from client_api_recorder import RequestRecorder
+
+        recorder = RequestRecorder(
+            Path(config.record_file),
+            sample_rate=config.record_sample,
+            include_bodies=config.record_bodies,
+            redact_keys=config.record_redact,
+            max_bytes=config.record_max_bytes,
+        )
+        _recorders[config.record_file] = recorder
+        atexit.register(recorder.close)
+    else:
+        recorder.sample_rate = config.record_sample
+        recorder.include_bodies = config.record_bodies
+        recorder.redact_keys = frozenset(config.record_redact)
+        recorder.max_bytes = config.record_max_bytes
+    return recorder
+
+
+_schedulers: Dict[str, "SchedulerClient"] = {}
+
+
+def _shared_scheduler(address: str) -> "SchedulerClient":
+    scheduler = _schedulers.get(address)
+    if scheduler is None:
+        from client_api_scheduler import SchedulerClient
+
+        scheduler = SchedulerClient(address)
+        _schedulers[address] = scheduler
+    return scheduler
+
+
+_rate_windows: Dict[str, "RateWindow"] = {}
+
+
+def _shared_rate_window(account: str, limit: int, window: float) -> "RateWindow":
+    # One window per account: the server counts requests per account, not per command.
+    rate_window = _rate_windows.get(account)
+    if rate_window is None:
+        from client_api_plan import RateWindow
+
+        rate_window = RateWindow(limit, window)
+        _rate_windows[account] = rate_window
+    rate_window.limit = max(limit, 1)
+    rate_window.window = window
+    return rate_window
 
 
 @dataclass
@@ -25,6 +147,19 @@ class ClientApiConfig:
     basic_password: str
     account_uid: str
     api_key: str
+    cache_dir: Optional[str] = None
+    cache_ttl: float = 0.0
+    cache_stats: bool = False
+    record_file: Optional[str] = None
+    record_sample: float = 1.0
+    record_bodies: bool = False
+    record_redact: Tuple[str, ...] = ()
+    record_max_bytes: int = 0
+    gzip_requests: bool = False
+    scheduler_address: Optional[str] = None
+    priority: str = "interactive"
+    rate_limit: int = 0
+    rate_window: float = 60.0
 
     @classmethod
     def from_env(cls) -> "ClientApiConfig":
@@ -34,6 +169,11 @@ class ClientApiConfig:
             basic_password=os.getenv("CLIENT_API_BASIC_PASSWORD", ""),
             account_uid=os.getenv("CLIENT_API_ACCOUNT", ""),
             api_key=os.getenv("CLIENT_API_KEY", ""),
+            cache_dir=os.getenv("CLIENT_API_CACHE_DIR") or None,
+            cache_ttl=float(os.getenv("CLIENT_API_CACHE_TTL", "0")),
+            record_file=os.getenv("CLIENT_API_RECORD_FILE") or None,
+            gzip_requests=os.getenv("CLIENT_API_GZIP_REQUESTS", "") in ("1", "true", "yes"),
+            scheduler_address=os.getenv("CLIENT_API_SCHEDULER") or None,
         )
 
 
@@ -65,6 +205,67 @@ def build_parser(description: str) -> argparse.ArgumentParser:
         default=env_config.api_key or None,
         help="Plaintext API key used for X-Client-Api-Key (env: CLIENT_API_KEY)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=env_config.cache_dir,
+        help="Directory for the GET response cache; disabled when unset (env: CLIENT_API_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=env_config.cache_ttl,
+        help="Seconds to serve cached responses that carry no ETag/Last-Modified (env: CLIENT_API_CACHE_TTL)",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print cache hit/miss statistics to stderr on exit.",
+    )
+    parser.add_argument(
+        "--record-file",
+        default=env_config.record_file,
+        help="Append a JSONL record of every request to this file (env: CLIENT_API_RECORD_FILE)",
+    )
+    parser.add_argument(
+        "--record-sample",
+        type=float,
+        default=1.0,
+        help="Fraction of requests to record, 0..1 (default: 1).",
+    )
+    parser.add_argument(
+        "--record-bodies",
+        action="store_true",
+        help="Include JSON request bodies in the recording (needed to replay writes).",
+    )
+    parser.add_argument(
+        "--record-redact",
+        action="append",
+        default=[],
+        help="Body field name to replace with *** in recordings (repeatable).",
+    )
+    parser.add_argument(
+        "--record-max-bytes",
+        type=int,
+        default=0,
+        help="Rotate the recording once it reaches this size; 0 never rotates.",
+    )
+    parser.add_argument(
+        "--gzip-requests",
+        action="store_true",
+        default=env_config.gzip_requests,
+        help="Gzip JSON request bodies of 1 KiB or more (env: CLIENT_API_GZIP_REQUESTS=1)",
+    )
+    parser.add_argument(
+        "--scheduler-address",
+        default=env_config.scheduler_address,
+        help="HOST:PORT of client_api_scheduler.py; wait for a grant before each request (env: CLIENT_API_SCHEDULER)",
+    )
+    parser.add_argument(
+        "--priority",
+        choices=["interactive", "bulk", "background"],
+        default="interactive",
+        help="Scheduler priority class for this command's requests (default: interactive; bulk for bulk commands).",
+    )
     return parser
 
 
@@ -88,24 +289,79 @@ def config_from_args(args: argparse.Namespace) -> ClientApiConfig:
         basic_password=args.basic_password,
         account_uid=args.account_uid,
         api_key=args.api_key,
+        cache_dir=args.cache_dir,
+        cache_ttl=args.cache_ttl,
+        cache_stats=args.cache_stats,
+        record_file=args.record_file,
+        record_sample=args.record_sample,
+        record_bodies=args.record_bodies,
+        record_redact=tuple(args.record_redact),
+        record_max_bytes=args.record_max_bytes,
+        gzip_requests=args.gzip_requests,
+        scheduler_address=args.scheduler_address,
+        priority=args.priority,
+        # Only commands with plan arguments pace themselves (see client_api_plan.py).
+        rate_limit=getattr(args, "rate_limit", 0),
+        rate_window=getattr(args, "rate_window", 60.0),
     )
 
 
+def _retry_after(response: Response, default: float = 5.0) -> float:
+    try:
+        return max(float(response.headers.get("Retry-After", default)), 0.0)
+    except ValueError:
+        return default
+
+
 @dataclass
 class ClientApiSession:
     base_url: str
     session: requests.Session
+    cache: Optional[ResponseCache] = None
+    recorder: Optional[RequestRecorder] = None
+    gzip_requests: bool = False
+    bytes_sent: int = 0
+    scheduler: Optional[SchedulerClient] = None
+    account: str = ""
+    priority: str = "interactive"
+    rate_window: Optional[RateWindow] = None
 
     @classmethod
     def from_config(cls, config: ClientApiConfig) -> "ClientApiSession":
-        sess = requests.Session()
-        sess.auth = HTTPBasicAuth(config.basic_user, config.basic_password)
-        sess.headers.update({
-            "X-Client-Account": config.account_uid,
-            "X-Client-Api-Key": config.api_key,
-            "Accept": "application/json",
-        })
-        return cls(base_url=config.base_url.rstrip("/"), session=sess)
+        key = (config.basic_user, config.basic_password, config.account_uid, config.api_key)
+        sess = _session_pool.get(key) if _session_pool is not None else None
+        if sess is None:
+            with stage("setup"):
+                import requests
+            from requests.auth import HTTPBasicAuth
+
+            sess = requests.Session()
+            sess.auth = HTTPBasicAuth(config.basic_user, config.basic_password)
+            sess.headers.update({
+                "X-Client-Account": config.account_uid,
+                "X-Client-Api-Key": config.api_key,
+                "Accept": "application/json",
+            })
+            if _session_pool is not None:
+                _session_pool[key] = sess
+        cache = None
+        if config.cache_dir:
+            cache = _shared_cache(config.cache_dir, config.cache_ttl, config.cache_stats)
+        recorder = _shared_recorder(config) if config.record_file else None
+        rate_window = None
+        if config.rate_limit > 0 and not config.scheduler_address:
+            rate_window = _shared_rate_window(config.account_uid, config.rate_limit, config.rate_window)
+        return cls(
+            base_url=config.base_url.rstrip("/"),
+            session=sess,
+            cache=cache,
+            recorder=recorder,
+            gzip_requests=config.gzip_requests,
+            scheduler=_shared_scheduler(config.scheduler_address) if config.scheduler_address else None,
+            account=config.account_uid,
+            priority=config.priority,
+            rate_window=rate_window,
+        )
 
     @classmethod
     def from_env(cls) -> "ClientApiSession":
@@ -128,14 +384,134 @@ class ClientApiSession:
     def request(self, method: str, path: str, timeout: float = 30, **kwargs: Any) -> Response:
         """
         Send a raw HTTP request and raise for HTTP errors.
+
+        GET requests go through the response cache when one is configured;
+        whatever actually goes over the network (cache misses and revalidations
+        included, fresh cache hits not) first waits for a scheduler grant or the
+        local rate window when either is configured. Every request is then
+        handed to the recorder when one is configured. A 429 is retried after
+        its Retry-After.
         """
         if not path.startswith("/"):
             path = f"/{path}"
         url = f"{self.base_url}{path}"
-        response = self.session.request(method=method.upper(), url=url, timeout=timeout, **kwargs)
+        method = method.upper()
+        retries = 0
+        while True:
+            try:
+                return self._attempt(method, path, url, timeout, **kwargs)
+            except Exception as exc:
+                response = getattr(exc, "response", None)
+                if response is None or response.status_code != 429 or retries >= MAX_429_RETRIES:
+                    raise
+                retries += 1
+                delay = _retry_after(response)
+                print(
+                    f"429 Too Many Requests for {method} {path}; retrying in {delay:g} s "
+                    f"({retries}/{MAX_429_RETRIES}).",
+                    file=sys.stderr,
+                )
+                if self.scheduler is None:
+                    # With a scheduler, its backoff already holds the next grant back.
+                    with stage("wait"):
+                        time.sleep(delay)
+
+    @contextlib.contextmanager
+    def _network(self) -> Iterator[None]:
+        """
+        Wrap one request on the wire: wait for the grant first, time it as `network`.
+        """
+        slot = self._acquire()
+        try:
+            with stage("network"):
+                yield
+        finally:
+            if slot is not None:
+                self.rate_window.finished(slot)
+
+    def _acquire(self) -> Optional[List[float]]:
+        """
+        Wait until the next request may go out: a scheduler grant, else the local rate window
+        (whose slot is returned, to be passed to `rate_window.finished` after the response).
+        """
+        if self.scheduler is not None:
+            with stage("wait"):
+                self.scheduler.acquire(self.account, self.priority)
+        elif self.rate_window is not None:
+            with stage("wait"):
+                return self.rate_window.wait()
+        return None
+
+    def _attempt(self, method: str, path: str, url: str, timeout: float, **kwargs: Any) -> Response:
+        if self.recorder is None:
+            return self._send(method, url, timeout, **kwargs)
+
+        started = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = self._send(method, url, timeout, **kwargs)
+            return response
+        except Exception as exc:
+            response = getattr(exc, "response", None)
+            error = type(exc).__name__
+            raise
+        finally:
+            self.recorder.record(
+                method,
+                path,
+                kwargs.get("params"),
+                kwargs.get("json"),
+                response,
+                time.perf_counter() - started,
+                error,
+            )
+
+    def _send(self, method: str, url: str, timeout: float, **kwargs: Any) -> Response:
+        if self.cache is not None and method == "GET":
+            response = self.cache.get(self.session, url, timeout=timeout, network=self._network, **kwargs)
+        elif self.gzip_requests and kwargs.get("json") is not None:
+            response = self._send_compressed(method, url, timeout, **kwargs)
+        else:
+            if profiling() and kwargs.get("json") is not None:
+                from client_api_payload import requests_json_bytes
+
+                # Encode up front (same bytes as json=) so serialization is timed apart from the network.
+                with stage("serialize"):
+                    kwargs["data"] = requests_json_bytes(kwargs.pop("json"))
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+            with self._network():
+                response = self.session.request(method=method, url=url, timeout=timeout, **kwargs)
+        body = response.request.body if response.request is not None else None
+        if body is not None and not hasattr(body, "read"):
+            self.bytes_sent += len(body)
+        if response.status_code == 429 and self.scheduler is not None:
+            self.scheduler.backoff(self.account, _retry_after(response))
         response.raise_for_status()
         return response
 
+    def _send_compressed(self, method: str, url: str, timeout: float, **kwargs: Any) -> Response:
+        from client_api_payload import encode_body
+
+        with stage("serialize"):
+            data, encoding = encode_body(kwargs["json"], compress=True)
+        if encoding is None:
+            with self._network():
+                return self.session.request(method=method, url=url, timeout=timeout, **kwargs)
+        body = kwargs.pop("json")
+        headers = dict(kwargs.pop("headers", None) or {})
+        compressed = {**headers, "Content-Type": "application/json", "Content-Encoding": encoding}
+        with self._network():
+            response = self.session.request(method=method, url=url, timeout=timeout, data=data, headers=compressed, **kwargs)
+        if response.status_code != 415:
+            return response
+        self.bytes_sent += len(data)
+        print("Server rejected compressed request bodies (415); sending them uncompressed.", file=sys.stderr)
+        self.gzip_requests = False
+        # The resend is a second request against the rate budget: it needs its own grant.
+        with self._network():
+            return self.session.request(method=method, url=url, timeout=timeout, json=body, headers=headers or None, **kwargs)
+
     def json(self, method: str, path: str, timeout: float = 30, **kwargs: Any) -> Optional[Dict[str, Any]]:
         """
         Convenience wrapper that returns JSON bodies (or None for empty responses).
@@ -143,7 +519,8 @@ class ClientApiSession:
         response = self.request(method=method, path=path, timeout=timeout, **kwargs)
         if not response.content:
             return None
-        return response.json()
+        with stage("process"):
+            return response.json()
 
     @staticmethod
     def pretty(data: Any) -> str:
@@ -153,4 +530,10 @@ class ClientApiSession:
         return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
 
 
-__all__ = ["ClientApiSession", "ClientApiConfig", "build_parser", "config_from_args"]
+__all__ = [
+    "ClientApiSession",
+    "ClientApiConfig",
+    "build_parser",
+    "config_from_args",
+    "enable_session_pool",
+]
@@ -0,0 +1,117 @@
+"""
+Convert a CRM export (CSV or XML) into BriefAdvert payloads.
+
+The column mapping lives in a JSON file (see examples/feed_mapping.json and
+client_api_feed.py). Output is written as NDJSON, ready for
+client_api_bulk_create_adverts.py --payload-file, or sent directly with --send,
+in which case every batch becomes one POST /api/v1/adverts/bulk-create request.
+--plan converts the feed the same way and prints the bulk-create schedule that
+--send would follow, without sending (see client_api_plan.py). --slim and
+--slim-defaults apply to sent and planned bodies, not to the --output file.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List, Optional
+
+from client_api_feed import FeedMapping, iter_feed_batches
+from client_api_payload import PayloadSlimmer, add_payload_arguments
+from client_api_plan import SendProgress, add_plan_arguments, plan_from_args
+from client_api_profile import add_profile_arguments, iter_stage, stage, start_profiling
+from client_api_session import build_parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser("Transform a CSV/XML feed into BriefAdvert payloads (optionally POST bulk-create).")
+    parser.set_defaults(priority="bulk")
+    parser.add_argument("--feed-file", type=Path, required=True, help="CSV or XML export to convert.")
+    parser.add_argument("--mapping-file", type=Path, required=True, help="JSON column mapping.")
+    parser.add_argument("--output", type=Path, default=None, help="NDJSON file to write the payloads to.")
+    parser.add_argument(
+        "--send",
+        action="store_true",
+        help="Send every batch to POST /api/v1/adverts/bulk-create instead of (or besides) writing it.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Adverts per batch and per bulk request (default: 100, the server-side bulk limit).",
+    )
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter (default: ',').")
+    parser.add_argument("--record-tag", default="advert", help="XML element holding one advert (default: advert).")
+    add_payload_arguments(parser)
+    add_plan_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    start_profiling(args)
+
+    if not args.output and not args.send and not args.plan:
+        parser.error("Provide --output, --send, --plan, or a combination.")
+    if args.send and args.plan:
+        parser.error("--plan replaces --send; use one or the other.")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1.")
+
+    mapping = FeedMapping.from_file(args.mapping_file)
+    batches = iter_feed_batches(
+        args.feed_file,
+        mapping,
+        batch_size=args.batch_size,
+        delimiter=args.delimiter,
+        record_tag=args.record_tag,
+    )
+
+    api = None
+    if args.send:
+        from client_api_bulk_create_adverts import print_errors
+        from client_api_session import ClientApiSession, config_from_args
+
+        api = ClientApiSession.from_config(config_from_args(args))
+    plan = plan_from_args(args, "POST", "/adverts/bulk-create") if args.plan else None
+    slimmer = PayloadSlimmer.from_args(args)
+
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False).encode
+    total = created = 0
+    handle = args.output.open("w", encoding="utf-8") if args.output else None
+    progress = SendProgress(enabled=api is not None)
+    try:
+        with progress:
+            # Reading and converting the feed is one lazy step, profiled as "transform".
+            for batch in iter_stage("transform", batches):
+                total += len(batch)
+                if handle is not None:
+                    with stage("serialize"):
+                        handle.write("\n".join(map(encode, batch)))
+                        handle.write("\n")
+                if api is None and plan is None:
+                    continue
+                with stage("build"):
+                    body = slimmer.body("adverts", batch)
+                if api is not None:
+                    response = api.json("POST", "/adverts/bulk-create", json=body) or {}
+                    progress.sent(len(batch))
+                    with stage("process"):
+                        created += len(response.get("adverts", []))
+                        print_errors(response.get("errors", []))
+                if plan is not None:
+                    plan.add(len(batch), body)
+    finally:
+        if handle is not None:
+            handle.close()
+
+    print(f"Transformed {total} advert(s).")
+    if args.output:
+        print(f"Wrote payloads to {args.output}.")
+    if api is not None:
+        print(f"Created {created} advert(s) in bulk.")
+    if plan is not None:
+        plan.report()
+        slimmer.report(plan.payload_bytes, "planned")
+    elif api is not None:
+        slimmer.report(api.bytes_sent)
+
+
+if __name__ == "__main__":
+    main()
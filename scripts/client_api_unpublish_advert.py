@@ -3,17 +3,19 @@ Unpublish an advert via POST /api/v1/adverts/{advert_id}/unpublish.
 """
 from __future__ import annotations
 
+from typing import List, Optional
+
 from client_api_session import ClientApiSession, build_parser, config_from_args
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Unpublish an advert (POST /api/v1/adverts/{advert_id}/unpublish).")
     parser.add_argument(
         "--advert-id",
         required=True,
         help="Advert identifier to unpublish.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     api = ClientApiSession.from_config(config_from_args(args))
     result = api.json("POST", f"/adverts/{args.advert_id}/unpublish")
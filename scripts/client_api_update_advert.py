@@ -7,12 +7,13 @@ Provide --payload-file to send your own JSON payload.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import List, Optional
 
 from client_api_session import ClientApiSession, build_parser, config_from_args
 from tutorial_utils import build_sample_brief_advert, load_json_dict
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     parser = build_parser("Update an advert (PUT /api/v1/adverts/{advert_id}).")
     parser.add_argument(
         "--advert-id",
@@ -25,7 +26,7 @@ def main() -> None:
         default=None,
         help="JSON file containing a BriefAdvert payload.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     api = ClientApiSession.from_config(config_from_args(args))
     payload = load_json_dict(args.payload_file) if args.payload_file else build_sample_brief_advert()
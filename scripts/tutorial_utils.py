@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
 
 
 def load_json_file(path: Path) -> Any:
@@ -25,6 +30,30 @@ def load_json_list(path: Path) -> List[Any]:
     return payload
 
 
+def iter_json_records(path: Path) -> Iterator[Any]:
+    """
+    Yield items from a JSON array file, or line by line from an NDJSON (.ndjson/.jsonl) file.
+    """
+    if path.suffix.lower() not in NDJSON_SUFFIXES:
+        yield from load_json_list(path)
+        return
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def parse_comma_list(value: Optional[str]) -> List[str]:
     if not value:
         return []
@@ -32,27 +61,17 @@ def parse_comma_list(value: Optional[str]) -> List[str]:
 
 
 def read_ids(ids: Optional[str], ids_file: Optional[Path]) -> List[str]:
-    result: List[str] = []
-    result.extend(parse_comma_list(ids))
+    """
+    Combine comma-separated IDs and an ID file into a de-duplicated list (first-seen order).
+
+    See client_api_idset.py for the accepted file formats and for streaming large files.
+    """
+    from client_api_idset import IdSet, iter_ids_from_file
 
+    result = IdSet(parse_comma_list(ids))
     if ids_file:
-        payload = load_json_file(ids_file)
-        if isinstance(payload, list):
-            result.extend(str(item) for item in payload)
-        elif isinstance(payload, dict) and "advert_ids" in payload:
-            result.extend(str(item) for item in payload["advert_ids"])
-        else:
-            raise ValueError("IDs file must be a JSON array or an object with 'advert_ids'.")
-
-    seen = set()
-    unique: List[str] = []
-    for item in result:
-        if item in seen:
-            continue
-        seen.add(item)
-        unique.append(item)
-
-    return unique
+        result.update(iter_ids_from_file(ids_file))
+    return list(result)
 
 
 def build_sample_brief_advert(index: int = 1) -> Dict[str, object]: